@@ -9,6 +9,7 @@ This module provides:
 
 import asyncio
 import json
+import logging
 import os
 import sys
 from typing import Dict, List, Optional
@@ -30,6 +31,8 @@ from app.repository.video_repository import VideoRepository
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class ChatAgent:
     """WebSocket-based chat agent with Gemini integration."""
@@ -315,9 +318,9 @@ async def handle_websocket_chat(websocket: WebSocket):
                 await websocket.send_text(json.dumps(error_msg))
                 
     except WebSocketDisconnect:
-        print("WebSocket client disconnected")
+        logger.info("WebSocket client disconnected")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error")
         try:
             error_msg = {
                 "type": "error", 
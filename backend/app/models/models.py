@@ -80,6 +80,15 @@ class VideoUpdate(BaseModel):
     )
 
 
+class VideoSummary(VideoBase):
+    id: str  # UUID stored as string
+    timestamp: datetime
+    frame_count: int = 0
+    transcript: Optional[str] = Field(default=None, description="Audio transcription text")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class VideoResponse(VideoBase):
     id: str  # UUID stored as string
     frames: List[str]
@@ -9,17 +9,18 @@ and the database, implementing the Repository pattern for:
 """
 
 import sys
-from datetime import datetime
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 
 sys.path.append("../..")
+from database.database import in_json_array
 from database.models import AudioModel
-from sqlalchemy import delete, update
+from sqlalchemy import delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from ..utils.embedding import calculate_cosine_similarity, generate_text_embedding
+from ..utils.embedding import generate_query_embedding_async
+from ..utils.vector_index import EmbeddingIndex, audio_embeddings
 
 
 class AudioRepository:
@@ -50,28 +51,22 @@ class AudioRepository:
         Args:
             transcription: Natural language transcription text
 
+        The embedding is left empty and filled in later by the background
+        embedding worker, so the request does not wait on the embedding API.
+
         Returns:
-            AudioModel: The created audio record with generated ID, timestamp, and embedding
+            AudioModel: The created audio record with generated ID and timestamp
 
         Raises:
             SQLAlchemyError: If database operation fails
         """
-        # Generate embedding from transcription if available
-        embedding = None
-        if transcription and transcription.strip():
-            embedding = generate_text_embedding(transcription)
-
         # Create new audio model instance
-        audio = AudioModel(
-            transcription=transcription,
-            embedding=embedding,
-            timestamp=datetime.now(),
-        )
+        audio = AudioModel(transcription=transcription)
 
-        # Add to session and commit to database
+        # Add to session and commit to database; the timestamp comes back from
+        # the INSERT itself, so no refresh is needed
         self.session.add(audio)
         await self.session.commit()
-        await self.session.refresh(audio)  # Refresh to get generated fields
         return audio
 
     async def get_audio_by_id(self, audio_id: Union[UUID, str]) -> Optional[AudioModel]:
@@ -89,6 +84,22 @@ class AudioRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_audios_by_ids(self, audio_ids: List[str]) -> Dict[str, AudioModel]:
+        """Retrieve several audio records in a single query.
+
+        Args:
+            audio_ids: Audio IDs to look up (duplicates are ignored)
+
+        Returns:
+            Dict[str, AudioModel]: Found audio records keyed by ID
+        """
+        if not audio_ids:
+            return {}
+        result = await self.session.execute(
+            select(AudioModel).where(in_json_array(AudioModel.id, set(audio_ids)))
+        )
+        return {audio.id: audio for audio in result.scalars().all()}
+
     async def get_all_audio(self, skip: int = 0, limit: int = 100) -> List[AudioModel]:
         """Get all audio records with pagination.
 
@@ -107,6 +118,24 @@ class AudioRepository:
         )
         return list(result.scalars().all())
 
+    async def get_embedding_index(self) -> EmbeddingIndex:
+        """Return the shared audio embedding index, loading it on first use.
+
+        Returns:
+            EmbeddingIndex: Index of every audio record with an embedding
+        """
+        if not audio_embeddings.loaded:
+            async with audio_embeddings.lock:
+                if not audio_embeddings.loaded:
+                    result = await self.session.execute(
+                        select(AudioModel.id, AudioModel.embedding)
+                        .where(AudioModel.embedding.is_not(None))
+                        .where(AudioModel.transcription.is_not(None))
+                        .where(AudioModel.transcription != "")
+                    )
+                    audio_embeddings.load(result.all())
+        return audio_embeddings
+
     async def search_audio_by_similarity(
         self, query_text: str, threshold: float = 0.7, limit: int = 10
     ) -> List[tuple[AudioModel, float]]:
@@ -122,32 +151,33 @@ class AudioRepository:
                                            sorted by similarity score (highest first)
         """
         # Generate embedding for the query text
-        query_embedding = generate_text_embedding(query_text)
+        query_embedding = await generate_query_embedding_async(query_text)
         if not query_embedding:
             return []
 
-        # Get all audio records that have embeddings
+        # Score against the in-memory index instead of decoding every stored
+        # embedding, and keep the best matches above the threshold
+        index = await self.get_embedding_index()
+        matches = [
+            (audio_id, score)
+            for audio_id, score in index.search(query_embedding, limit)
+            if score >= threshold
+        ]
+        if not matches:
+            return []
+
+        # Load full rows only for the matches
         result = await self.session.execute(
-            select(AudioModel)
-            .where(AudioModel.embedding.is_not(None))
-            .where(AudioModel.transcription.is_not(None))
-            .where(AudioModel.transcription != "")
+            select(AudioModel).where(
+                in_json_array(AudioModel.id, [audio_id for audio_id, _ in matches])
+            )
         )
-        audio_records = list(result.scalars().all())
-
-        # Calculate similarity scores
-        similarities = []
-        for audio in audio_records:
-            if audio.embedding is not None and isinstance(audio.embedding, list):
-                similarity = calculate_cosine_similarity(
-                    query_embedding, audio.embedding
-                )
-                if similarity >= threshold:
-                    similarities.append((audio, similarity))
-
-        # Sort by similarity score (highest first) and limit results
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:limit]
+        audio_by_id = {audio.id: audio for audio in result.scalars().all()}
+        return [
+            (audio_by_id[audio_id], score)
+            for audio_id, score in matches
+            if audio_id in audio_by_id
+        ]
 
     async def get_images_by_audio_similarity(
         self, query_text: str, threshold: float = 0.7, limit: int = 10
@@ -178,7 +208,7 @@ class AudioRepository:
 
         # Find images that reference these audio IDs
         result = await self.session.execute(
-            select(ImageModel.id).where(ImageModel.audio_id.in_(audio_ids))
+            select(ImageModel.id).where(in_json_array(ImageModel.audio_id, audio_ids))
         )
 
         return [image_id for image_id in result.scalars().all()]
@@ -224,23 +254,65 @@ class AudioRepository:
 
         if transcription is not None:
             update_data[AudioModel.transcription] = transcription
-            # Generate new embedding when transcription is updated
-            if transcription.strip():
-                embedding = generate_text_embedding(transcription)
-                update_data[AudioModel.embedding] = embedding
-            else:
-                update_data[AudioModel.embedding] = None
+            # Clear the stale embedding; the background worker regenerates it
+            update_data[AudioModel.embedding] = None
 
         if not update_data:
             return await self.get_audio_by_id(audio_id)
 
         await self.session.execute(
-            update(AudioModel).where(AudioModel.id == id_str).values(**update_data)
+            update(AudioModel).where(AudioModel.id == id_str).values(update_data)
         )
         await self.session.commit()
+        async with audio_embeddings.lock:
+            audio_embeddings.remove(id_str)
 
         return await self.get_audio_by_id(audio_id)
 
+    async def get_audio_without_embedding(
+        self, limit: int = 10, exclude_ids: Optional[List[str]] = None
+    ) -> List[AudioModel]:
+        """Get audio records that have a transcription but no embedding yet.
+
+        Args:
+            limit: Maximum number of records to return
+            exclude_ids: IDs to skip, such as records waiting to be retried
+
+        Returns:
+            List[AudioModel]: Oldest audio records still waiting for an embedding
+        """
+        query = (
+            select(AudioModel)
+            .where(AudioModel.embedding.is_(None))
+            .where(AudioModel.transcription.is_not(None))
+            .where(AudioModel.transcription != "")
+        )
+        if exclude_ids:
+            query = query.where(~in_json_array(AudioModel.id, exclude_ids))
+        result = await self.session.execute(
+            query.order_by(AudioModel.timestamp).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def set_audio_embedding(
+        self, audio_id: Union[UUID, str], embedding: List[float]
+    ) -> None:
+        """Store the embedding generated for an audio record.
+
+        Args:
+            audio_id: UUID or string representation of the audio ID
+            embedding: Embedding vector of the transcription
+        """
+        id_str = str(audio_id) if isinstance(audio_id, UUID) else audio_id
+        await self.session.execute(
+            update(AudioModel)
+            .where(AudioModel.id == id_str)
+            .values(embedding=embedding)
+        )
+        await self.session.commit()
+        async with audio_embeddings.lock:
+            audio_embeddings.add(id_str, embedding)
+
     async def delete_audio(self, audio_id: Union[UUID, str]) -> bool:
         """Delete an audio transcription record.
 
@@ -255,6 +327,8 @@ class AudioRepository:
             delete(AudioModel).where(AudioModel.id == id_str)
         )
         await self.session.commit()
+        async with audio_embeddings.lock:
+            audio_embeddings.remove(id_str)
         return result.rowcount > 0
 
     async def count_audio(self) -> int:
@@ -263,8 +337,7 @@ class AudioRepository:
         Returns:
             int: Total number of audio transcription records
         """
-        result = await self.session.execute(select(AudioModel.id))
-        return len(result.scalars().all())
+        return await self.session.scalar(select(func.count()).select_from(AudioModel))
 
     async def get_recent_audio(self, limit: int = 10) -> List[AudioModel]:
         """Get the most recent audio transcription records.
@@ -8,19 +8,30 @@ and the database, implementing the Repository pattern for:
 - Data validation and error handling
 """
 
-import os
+import asyncio
 import sys
 
 sys.path.append("../..")
-from datetime import datetime
 from typing import List, Optional, Tuple, Union
 from uuid import UUID
 
-from database.models import AudioModel, ImageModel
-from sqlalchemy import delete, select, update
+import numpy as np
+from database.database import in_json_array
+from database.models import ImageModel, ImageTag
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..utils.embedding import calculate_cosine_similarity, generate_text_embedding
+from ..utils.blob_store import read_blob
+from ..utils.image_utils import payload_to_base64
+from ..utils.embedding import generate_query_embedding_async, top_k_indices
+from .audio_repository import AudioRepository
+
+# INSERT ... RETURNING for the upload hot path. Built once so every call hits the
+# same compiled-cache entry, and RETURNING saves the follow-up refresh SELECT.
+_INSERT_IMAGE = insert(ImageModel).returning(ImageModel)
+
+# Multi-row variant; rows come back in the order their parameters were given
+_INSERT_IMAGES = insert(ImageModel).returning(ImageModel, sort_by_parameter_order=True)
 
 
 class ImageRepository:
@@ -43,42 +54,24 @@ class ImageRepository:
         self.session = session
 
     def _read_image_base64(self, path: str) -> Optional[str]:
-        """Read base64 image data from file.
+        """Read base64 image data from the image store.
 
         Args:
-            path: Relative path to the image file (e.g., "filename.b64")
+            path: Segment reference or legacy file name (e.g., "filename.b64")
 
         Returns:
-            Base64 encoded image data or None if file doesn't exist
+            Base64 encoded image data or None if it cannot be read
         """
-        try:
-            filepath = os.path.join("images", path)
-            if os.path.exists(filepath):
-                with open(filepath, "r") as f:
-                    return f.read().strip()
-            return None
-        except Exception:
-            return None
-
-    def _enrich_image_with_base64(self, image: ImageModel) -> ImageModel:
-        """Enrich an ImageModel with base64 data by reading from file.
-
-        Args:
-            image: ImageModel instance to enrich
+        data = read_blob(path)
+        return payload_to_base64(data) if data is not None else None
 
-        Returns:
-            ImageModel with image attribute set to base64 data
-        """
-        # Read base64 data from file and add it to the model
-        # Cast to str to help type checker understand this is the actual string value
-        image_path: str = str(image.path)
-        base64_data = self._read_image_base64(image_path)
-        # Add the base64 data as a new attribute to the model instance
-        setattr(image, "image", base64_data)
-        return image
+    async def _enrich_images_with_base64(
+        self, images: List[ImageModel]
+    ) -> List[ImageModel]:
+        """Enrich ImageModel objects with their base64 data from the image store.
 
-    def _enrich_images_with_base64(self, images: List[ImageModel]) -> List[ImageModel]:
-        """Enrich multiple ImageModel objects with base64 data.
+        The whole page is read in one worker thread, so the file reads never
+        block the event loop.
 
         Args:
             images: List of ImageModel instances to enrich
@@ -86,7 +79,16 @@ class ImageRepository:
         Returns:
             List of ImageModel instances with image attribute set
         """
-        return [self._enrich_image_with_base64(image) for image in images]
+        if not images:
+            return images
+        paths = [str(image.path) for image in images]
+        base64_data = await asyncio.to_thread(
+            lambda: [self._read_image_base64(path) for path in paths]
+        )
+        for image, data in zip(images, base64_data):
+            # Add the base64 data as a new attribute to the model instance
+            setattr(image, "image", data)
+        return images
 
     async def create_image(
         self,
@@ -98,6 +100,7 @@ class ImageRepository:
         audio_id: Optional[str] = None,
         latitude: Optional[float] = None,
         longitude: Optional[float] = None,
+        image_id: Optional[str] = None,
     ) -> ImageModel:
         """Create a new image record in the database.
 
@@ -110,6 +113,7 @@ class ImageRepository:
             audio_id: Optional reference to AudioModel ID
             latitude: Optional GPS latitude coordinate
             longitude: Optional GPS longitude coordinate
+            image_id: Optional primary key; generated by the model when omitted
 
         Returns:
             ImageModel: The created image record with generated ID and timestamp
@@ -120,25 +124,47 @@ class ImageRepository:
         if tags is None:
             tags = []
 
-        # Create new image model instance
-        image = ImageModel(
-            path=path,
-            description=description,
-            tags=tags,
-            embeddings=embeddings,
-            tagged=tagged,
-            audio_id=audio_id,  # Store reference to AudioModel ID
-            timestamp=datetime.utcnow(),
-            latitude=latitude,
-            longitude=longitude,
-        )
-
-        # Add to session and commit to database
-        self.session.add(image)
+        values = {
+            "path": path,
+            "description": description,
+            "tags": tags,
+            "embeddings": embeddings,
+            "tagged": tagged,
+            "audio_id": audio_id,  # Store reference to AudioModel ID
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+        if image_id is not None:
+            values["id"] = image_id
+
+        # Insert and read back generated fields in a single round trip
+        result = await self.session.scalars(_INSERT_IMAGE, values)
+        image = result.one()
         await self.session.commit()
-        await self.session.refresh(image)  # Refresh to get generated fields
         return image
 
+    async def create_images_bulk(self, rows: List[dict]) -> List[ImageModel]:
+        """Create several image records with one batched INSERT and one commit.
+
+        Rows should carry a client-generated ``id`` so the statement does not
+        fall back to the model's per-row default.
+
+        Args:
+            rows: Column values per image, keyed like ``create_image`` arguments
+                (with ``id`` instead of ``image_id``)
+
+        Returns:
+            List[ImageModel]: The created records, in the same order as ``rows``
+        """
+        if not rows:
+            return []
+
+        # One multi-VALUES INSERT ... RETURNING for the whole batch
+        result = await self.session.scalars(_INSERT_IMAGES, rows)
+        images = list(result.all())
+        await self.session.commit()
+        return images
+
     async def get_image_by_id(self, image_id: Union[UUID, str]) -> Optional[ImageModel]:
         """Retrieve an image record by its unique identifier.
 
@@ -172,7 +198,7 @@ class ImageRepository:
             .limit(limit)
         )
         images = list(result.scalars().all())
-        return self._enrich_images_with_base64(images)
+        return await self._enrich_images_with_base64(images)
 
     async def get_tagged_images(
         self, skip: int = 0, limit: int = 100
@@ -186,21 +212,20 @@ class ImageRepository:
             .limit(limit)
         )
         images = list(result.scalars().all())
-        return self._enrich_images_with_base64(images)
+        return await self._enrich_images_with_base64(images)
 
     async def get_untagged_images(
-        self, skip: int = 0, limit: int = 100
+        self, skip: int = 0, limit: int = 100, exclude_ids: Optional[List[str]] = None
     ) -> List[ImageModel]:
-        """Get all untagged images."""
+        """Get all untagged images, skipping any IDs in ``exclude_ids``."""
+        query = select(ImageModel).where(ImageModel.tagged.is_(False))
+        if exclude_ids:
+            query = query.where(~in_json_array(ImageModel.id, exclude_ids))
         result = await self.session.execute(
-            select(ImageModel)
-            .where(ImageModel.tagged.is_(False))
-            .order_by(ImageModel.timestamp.desc())
-            .offset(skip)
-            .limit(limit)
+            query.order_by(ImageModel.timestamp.desc()).offset(skip).limit(limit)
         )
         images = list(result.scalars().all())
-        return self._enrich_images_with_base64(images)
+        return await self._enrich_images_with_base64(images)
 
     async def search_similar_audio_embeddings(
         self, query_embedding: List[float], limit: int = 50
@@ -218,25 +243,46 @@ class ImageRepository:
         if not query_embedding:
             return []
 
-        # Get all audio records with embeddings and their associated images
+        # Score every audio embedding once against the in-memory index
+        index = await AudioRepository(self.session).get_embedding_index()
+        audio_scores = index.scores(query_embedding)
+        if not len(audio_scores):
+            return []
+
+        # Each image takes the score of its audio; images whose audio has no
+        # embedding are left out
         result = await self.session.execute(
-            select(ImageModel, AudioModel.embedding)
-            .join(AudioModel, ImageModel.audio_id == AudioModel.id)
-            .where(AudioModel.embedding.is_not(None))
+            select(ImageModel.id, ImageModel.audio_id).where(
+                ImageModel.audio_id.is_not(None)
+            )
         )
+        candidates = [
+            (image_id, row)
+            for image_id, audio_id in result.all()
+            if (row := index.row(audio_id)) >= 0
+        ]
+        if not candidates:
+            return []
 
-        # Calculate similarity scores for each audio embedding
-        scored_images = []
-        for img, audio_embedding in result.all():
-            if not audio_embedding:
-                continue
-
-            similarity = calculate_cosine_similarity(query_embedding, audio_embedding)
-            scored_images.append((img, similarity))
+        # Keep the best matches (highest first)
+        image_ids, rows = zip(*candidates)
+        scores = audio_scores[np.fromiter(rows, dtype=np.intp, count=len(rows))]
+        matches = [
+            (image_ids[i], float(scores[i])) for i in top_k_indices(scores, limit)
+        ]
 
-        # Sort by similarity score (highest first) and return top results
-        scored_images.sort(key=lambda x: x[1], reverse=True)
-        return scored_images[:limit]
+        # Load full rows only for the matches
+        result = await self.session.execute(
+            select(ImageModel).where(
+                in_json_array(ImageModel.id, [image_id for image_id, _ in matches])
+            )
+        )
+        image_by_id = {image.id: image for image in result.scalars().all()}
+        return [
+            (image_by_id[image_id], score)
+            for image_id, score in matches
+            if image_id in image_by_id
+        ]
 
     async def get_images_by_audio(
         self, audio_description: str, limit: int = 50
@@ -252,14 +298,14 @@ class ImageRepository:
             If no similar images found, returns recent images as fallback.
         """
         # Generate embedding for the query text
-        query_embedding = generate_text_embedding(audio_description)
+        query_embedding = await generate_query_embedding_async(audio_description)
         if not query_embedding:
             # If embedding generation fails, return recent images
             result = await self.session.execute(
                 select(ImageModel).order_by(ImageModel.timestamp.desc()).limit(limit)
             )
             images = list(result.scalars().all())
-            return self._enrich_images_with_base64(images)
+            return await self._enrich_images_with_base64(images)
 
         # Get similar audio embeddings and return corresponding images
         similar_audio = await self.search_similar_audio_embeddings(
@@ -276,36 +322,35 @@ class ImageRepository:
             )
             images = list(result.scalars().all())
 
-        return self._enrich_images_with_base64(images)
+        return await self._enrich_images_with_base64(images)
         if not images:
             result = await self.session.execute(
                 select(ImageModel).order_by(ImageModel.timestamp.desc()).limit(limit)
             )
             images = result.scalars().all()
 
-        return self._enrich_images_with_base64(images)
+        return await self._enrich_images_with_base64(images)
 
     async def search_images_by_tags(
         self, tags: List[str], skip: int = 0, limit: int = 100
     ) -> List[ImageModel]:
         """Search images by tags (contains any of the provided tags)."""
-        # Note: This is a simple implementation. For more complex tag searching,
-        # you might want to use a different approach or a full-text search engine
+        # Look the tags up in the image_tags index so filtering happens before
+        # pagination and rows without a matching tag are never loaded
         result = await self.session.execute(
             select(ImageModel)
+            .where(
+                ImageModel.id.in_(
+                    select(ImageTag.image_id).where(in_json_array(ImageTag.tag, tags))
+                )
+            )
             .order_by(ImageModel.timestamp.desc())
             .offset(skip)
             .limit(limit)
         )
 
-        all_images = result.scalars().all()
-        filtered_images = []
-
-        for image in all_images:
-            if image.tags is not None and any(tag in image.tags for tag in tags):
-                filtered_images.append(image)
-
-        return self._enrich_images_with_base64(filtered_images)
+        images = list(result.scalars().all())
+        return await self._enrich_images_with_base64(images)
 
     async def update_image(
         self,
@@ -347,6 +392,19 @@ class ImageRepository:
 
         return await self.get_image_by_id(image_id)
 
+    async def update_images_bulk(self, updates: List[dict]) -> None:
+        """Update several image records in one statement.
+
+        Args:
+            updates: Column values per image, each including the image ``id``
+        """
+        if not updates:
+            return
+
+        # ORM bulk UPDATE by primary key: one executemany, one commit
+        await self.session.execute(update(ImageModel), updates)
+        await self.session.commit()
+
     async def delete_image(self, image_id: Union[UUID, str]) -> bool:
         """Delete an image record."""
         id_str = str(image_id) if isinstance(image_id, UUID) else image_id
@@ -362,22 +420,35 @@ class ImageRepository:
 
     async def count_images(self) -> int:
         """Count total number of images."""
-        result = await self.session.execute(select(ImageModel.id))
-        return len(result.scalars().all())
+        return await self.session.scalar(select(func.count()).select_from(ImageModel))
 
     async def count_tagged_images(self) -> int:
         """Count number of tagged images."""
-        result = await self.session.execute(
-            select(ImageModel.id).where(ImageModel.tagged.is_(True))
+        return await self.session.scalar(
+            select(func.count()).where(ImageModel.tagged.is_(True))
         )
-        return len(result.scalars().all())
 
     async def count_untagged_images(self) -> int:
         """Count number of untagged images."""
+        return await self.session.scalar(
+            select(func.count()).where(ImageModel.tagged.is_(False))
+        )
+
+    async def count_images_by_tagged(self) -> Tuple[int, int, int]:
+        """Count total, tagged and untagged images in a single query.
+
+        Returns:
+            Tuple[int, int, int]: Total, tagged and untagged image counts
+        """
         result = await self.session.execute(
-            select(ImageModel.id).where(ImageModel.tagged.is_(False))
+            select(
+                func.count(),
+                func.count().filter(ImageModel.tagged.is_(True)),
+                func.count().filter(ImageModel.tagged.is_(False)),
+            ).select_from(ImageModel)
         )
-        return len(result.scalars().all())
+        total, tagged, untagged = result.one()
+        return total, tagged, untagged
 
     async def get_image_locations(self) -> List[tuple[float, float]]:
         """Get all image locations."""
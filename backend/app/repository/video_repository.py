@@ -8,17 +8,53 @@ and the database, implementing the Repository pattern for:
 - Data validation and error handling
 """
 
+import asyncio
 import sys
 
 sys.path.append("../..")
-from datetime import datetime
-from typing import List, Optional, Union, cast
-from uuid import UUID
+from typing import List, Optional, Tuple, Union
+from uuid import UUID, uuid4
 
-from database.models import VideoModel
-from sqlalchemy import delete, update
+from database.database import in_json_array
+from database.models import AudioModel, FrameManifest, VideoModel, VideoTag
+from sqlalchemy import delete, func, null, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload, undefer
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..utils.blob_store import image_store, is_segment_reference, read_blob
+from ..utils.image_utils import pack_image_payload, unpack_image_payload
+
+
+def _store_frames(frames: List[str]) -> List[str]:
+    """Decode base64 frames once and append them to the segment store.
+
+    Args:
+        frames: Base64 encoded frames, optionally in data URL format
+
+    Returns:
+        List[str]: Segment references, in frame order
+    """
+    return [image_store.append(pack_image_payload(frame)) for frame in frames]
+
+
+async def _load_frames(videos: List[VideoModel]) -> None:
+    """Replace the frame references of loaded videos with their base64 frames.
+
+    The frames are read from the segment store in a worker thread, so the
+    file reads never block the event loop.
+
+    Args:
+        videos: Videos loaded with their ``frames`` column undeferred
+    """
+    if not videos:
+        return
+    frames = await asyncio.to_thread(
+        lambda: [FrameManifest.load_frames(video.frames) for video in videos]
+    )
+    for video, video_frames in zip(videos, frames):
+        set_committed_value(video, "frames", video_frames)
 
 
 class VideoRepository:
@@ -81,15 +117,19 @@ class VideoRepository:
         if duration is None and frames and fps > 0:
             duration = len(frames) / fps
 
+        # Only references to the stored frames go into the row; the file
+        # writes run in a thread to keep the event loop free
+        frame_refs = await asyncio.to_thread(_store_frames, frames)
+
         # Create new video model instance
         video = VideoModel(
-            frames=frames,
+            frames=frame_refs,
             tags=tags,
             tagged=tagged,
             fps=fps,
+            frame_count=len(frames),
             duration=duration,
             audio_id=audio_id,
-            timestamp=datetime.utcnow(),
             latitude=latitude,
             longitude=longitude,
         )
@@ -97,9 +137,56 @@ class VideoRepository:
         # Add to session and commit to database
         self.session.add(video)
         await self.session.commit()
-        await self.session.refresh(video)  # Refresh to get generated fields
+        await self.session.refresh(video, ["audio"])  # Load the linked audio record
+        # Hand back the uploaded frames instead of reading them from disk again
+        set_committed_value(video, "frames", frames)
         return video
 
+    async def create_video_with_audio(
+        self,
+        transcription: str,
+        frames: List[str],
+        tagged: bool = False,
+        tags: Optional[List[str]] = None,
+        fps: float = 30.0,
+        duration: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+    ) -> VideoModel:
+        """Create a video and its audio transcription record in one transaction.
+
+        Both rows are written by a single commit, so either both exist or
+        neither does.
+
+        Args:
+            transcription: Natural language transcription of the video's audio
+            frames: List of base64 encoded video frames
+            tagged: Whether the video has been processed by AI (default: False)
+            tags: List of descriptive tags (defaults to empty list)
+            fps: Frames per second
+            duration: Optional video duration in seconds
+            latitude: Optional GPS latitude coordinate
+            longitude: Optional GPS longitude coordinate
+
+        Returns:
+            VideoModel: The created video record with its audio loaded
+        """
+        # Assign the ID up front so the video can reference it without a flush
+        audio = AudioModel(id=str(uuid4()), transcription=transcription)
+        self.session.add(audio)
+
+        # create_video commits the pending audio row together with the video
+        return await self.create_video(
+            frames=frames,
+            tagged=tagged,
+            tags=tags,
+            fps=fps,
+            duration=duration,
+            audio_id=audio.id,
+            latitude=latitude,
+            longitude=longitude,
+        )
+
     async def get_video_by_id(self, video_id: Union[UUID, str]) -> Optional[VideoModel]:
         """Retrieve a video record by its unique identifier.
 
@@ -111,32 +198,147 @@ class VideoRepository:
         """
         id_str = str(video_id) if isinstance(video_id, UUID) else video_id
         result = await self.session.execute(
-            select(VideoModel).where(VideoModel.id == id_str)
+            select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
+            .where(VideoModel.id == id_str)
+        )
+        video = result.scalar_one_or_none()
+        if video is not None:
+            await _load_frames([video])
+        return video
+
+    async def get_video_frames(self, video_id: Union[UUID, str]) -> Optional[List[str]]:
+        """Get only the frames of a video.
+
+        Args:
+            video_id: UUID or string representation of the video ID
+
+        Returns:
+            Optional[List[str]]: Base64 encoded frames if the video exists, None otherwise
+        """
+        id_str = str(video_id) if isinstance(video_id, UUID) else video_id
+        result = await self.session.execute(
+            select(VideoModel.frames).where(VideoModel.id == id_str)
+        )
+        references = result.scalar_one_or_none()
+        if references is None:
+            return None
+        return await asyncio.to_thread(FrameManifest.load_frames, references)
+
+    async def get_frame_references(
+        self, video_id: Union[UUID, str]
+    ) -> Optional[List[str]]:
+        """Get a video's stored frame manifest without loading any frame.
+
+        Args:
+            video_id: UUID or string representation of the video ID
+
+        Returns:
+            Optional[List[str]]: Manifest entries (segment references, or base64
+            frames for older rows) if the video exists, None otherwise
+        """
+        id_str = str(video_id) if isinstance(video_id, UUID) else video_id
+        result = await self.session.execute(
+            select(VideoModel.frames).where(VideoModel.id == id_str)
         )
         return result.scalar_one_or_none()
 
+    async def get_video_frame(
+        self, video_id: Union[UUID, str], index: int
+    ) -> Optional[Tuple[bytes, str]]:
+        """Get a single frame of a video as image bytes.
+
+        Only that frame's manifest entry is extracted in SQL and only its
+        payload is read from the segment store.
+
+        Args:
+            video_id: UUID or string representation of the video ID
+            index: Position of the frame in the video
+
+        Returns:
+            Optional[Tuple[bytes, str]]: Image bytes and mime type, or None if
+            the video or frame does not exist
+        """
+        if index < 0:
+            return None
+        id_str = str(video_id) if isinstance(video_id, UUID) else video_id
+        result = await self.session.execute(
+            select(func.json_extract(VideoModel.frames, f"$[{index}]")).where(
+                VideoModel.id == id_str
+            )
+        )
+        frame = result.scalar_one_or_none()
+        if not isinstance(frame, str):
+            return None
+
+        if is_segment_reference(frame):
+            payload = await asyncio.to_thread(read_blob, frame)
+            if payload is None:
+                return None
+        else:
+            payload = frame.encode()
+        return unpack_image_payload(payload)
+
     async def get_all_videos(self, skip: int = 0, limit: int = 100) -> List[VideoModel]:
-        """Get all videos with pagination."""
+        """Get all videos with pagination.
+
+        Frames are left deferred, since reading them means loading every frame
+        from the segment store; accessing ``frames`` on the results raises.
+        """
         result = await self.session.execute(
             select(VideoModel)
+            .options(selectinload(VideoModel.audio))
             .order_by(VideoModel.timestamp.desc())
             .offset(skip)
             .limit(limit)
         )
         return list(result.scalars().all())
 
+    async def get_video_rows(
+        self, skip: int = 0, limit: int = 100, tagged: Optional[bool] = None
+    ) -> List[dict]:
+        """Get videos with their transcripts as plain dictionaries.
+
+        Uses a Core select with an outer join on the audio table, so no ORM
+        objects are built. Each row has the fields of ``VideoSummary``; frames
+        are left out so listing never reads the segment store.
+
+        Args:
+            skip: Number of records to skip (for pagination)
+            limit: Maximum number of records to return
+            tagged: Only tagged (True) or untagged (False) videos; all if None
+
+        Returns:
+            List[dict]: Video rows, newest first
+        """
+        query = select(
+            *(column for column in VideoModel.__table__.c if column.key != "frames"),
+            null().label("description"),
+            AudioModel.transcription.label("transcript"),
+        ).outerjoin(AudioModel, VideoModel.audio_id == AudioModel.id)
+        if tagged is not None:
+            query = query.where(VideoModel.tagged.is_(tagged))
+
+        result = await self.session.execute(
+            query.order_by(VideoModel.timestamp.desc()).offset(skip).limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+
     async def get_tagged_videos(
         self, skip: int = 0, limit: int = 100
     ) -> List[VideoModel]:
         """Get all tagged videos."""
         result = await self.session.execute(
             select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
             .where(VideoModel.tagged.is_(True))
             .order_by(VideoModel.timestamp.desc())
             .offset(skip)
             .limit(limit)
         )
-        return list(result.scalars().all())
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        return videos
 
     async def get_untagged_videos(
         self, skip: int = 0, limit: int = 100
@@ -144,32 +346,37 @@ class VideoRepository:
         """Get all untagged videos."""
         result = await self.session.execute(
             select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
             .where(VideoModel.tagged.is_(False))
             .order_by(VideoModel.timestamp.desc())
             .offset(skip)
             .limit(limit)
         )
-        return list(result.scalars().all())
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        return videos
 
     async def search_videos_by_tags(
         self, tags: List[str], skip: int = 0, limit: int = 100
     ) -> List[VideoModel]:
         """Search videos by tags (contains any of the provided tags)."""
+        # Tag lookups go through the indexed video_tags table instead of
+        # expanding every row's JSON tag array
         result = await self.session.execute(
             select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
+            .where(
+                VideoModel.id.in_(
+                    select(VideoTag.video_id).where(in_json_array(VideoTag.tag, tags))
+                )
+            )
             .order_by(VideoModel.timestamp.desc())
             .offset(skip)
             .limit(limit)
         )
-
-        all_videos = list(result.scalars().all())
-        filtered_videos = []
-
-        for video in all_videos:
-            if video.tags is not None and any(tag in video.tags for tag in tags):
-                filtered_videos.append(video)
-
-        return filtered_videos
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        return videos
 
     async def update_video(
         self,
@@ -198,6 +405,9 @@ class VideoRepository:
             update_data[VideoModel.tagged] = tagged
         if fps is not None:
             update_data[VideoModel.fps] = fps
+            if duration is None and fps > 0:
+                # Keep the stored duration consistent with the new frame rate
+                update_data[VideoModel.duration] = VideoModel.frame_count / fps
         if duration is not None:
             update_data[VideoModel.duration] = duration
         if audio is not None:
@@ -211,7 +421,7 @@ class VideoRepository:
             return await self.get_video_by_id(video_id)
 
         await self.session.execute(
-            update(VideoModel).where(VideoModel.id == id_str).values(**update_data)
+            update(VideoModel).where(VideoModel.id == id_str).values(update_data)
         )
         await self.session.commit()
 
@@ -228,22 +438,35 @@ class VideoRepository:
 
     async def count_videos(self) -> int:
         """Count total number of videos."""
-        result = await self.session.execute(select(VideoModel.id))
-        return len(list(result.scalars().all()))
+        return await self.session.scalar(select(func.count()).select_from(VideoModel))
 
     async def count_tagged_videos(self) -> int:
         """Count number of tagged videos."""
-        result = await self.session.execute(
-            select(VideoModel.id).where(VideoModel.tagged.is_(True))
+        return await self.session.scalar(
+            select(func.count()).where(VideoModel.tagged.is_(True))
         )
-        return len(list(result.scalars().all()))
 
     async def count_untagged_videos(self) -> int:
         """Count number of untagged videos."""
+        return await self.session.scalar(
+            select(func.count()).where(VideoModel.tagged.is_(False))
+        )
+
+    async def count_videos_by_tagged(self) -> Tuple[int, int, int]:
+        """Count total, tagged and untagged videos in a single query.
+
+        Returns:
+            Tuple[int, int, int]: Total, tagged and untagged video counts
+        """
         result = await self.session.execute(
-            select(VideoModel.id).where(VideoModel.tagged.is_(False))
+            select(
+                func.count(),
+                func.count().filter(VideoModel.tagged.is_(True)),
+                func.count().filter(VideoModel.tagged.is_(False)),
+            ).select_from(VideoModel)
         )
-        return len(list(result.scalars().all()))
+        total, tagged, untagged = result.one()
+        return total, tagged, untagged
 
     async def get_video_locations(self) -> List[dict]:
         """Get all unique video locations with coordinates.
@@ -274,9 +497,35 @@ class VideoRepository:
             Optional[VideoModel]: The video if found, None otherwise
         """
         result = await self.session.execute(
-            select(VideoModel).where(VideoModel.audio_id == audio_id)
+            select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
+            .where(VideoModel.audio_id == audio_id)
         )
-        return result.scalar_one_or_none()
+        video = result.scalar_one_or_none()
+        if video is not None:
+            await _load_frames([video])
+        return video
+
+    async def get_videos_by_audio_ids(self, audio_ids: List[str]) -> List[VideoModel]:
+        """Get the videos associated with any of the given audio IDs.
+
+        Args:
+            audio_ids: IDs of the associated audio records
+
+        Returns:
+            List[VideoModel]: Matching videos, in the order of ``audio_ids``
+        """
+        if not audio_ids:
+            return []
+        result = await self.session.execute(
+            select(VideoModel)
+            .options(selectinload(VideoModel.audio), undefer(VideoModel.frames))
+            .where(in_json_array(VideoModel.audio_id, audio_ids))
+        )
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        videos_by_audio = {video.audio_id: video for video in videos}
+        return [videos_by_audio[audio_id] for audio_id in audio_ids if audio_id in videos_by_audio]
 
     async def get_videos_by_duration_range(
         self,
@@ -286,7 +535,9 @@ class VideoRepository:
         limit: int = 100,
     ) -> List[VideoModel]:
         """Get videos within a specific duration range."""
-        query = select(VideoModel)
+        query = select(VideoModel).options(
+            selectinload(VideoModel.audio), undefer(VideoModel.frames)
+        )
 
         if min_duration is not None:
             query = query.where(VideoModel.duration >= min_duration)
@@ -296,7 +547,9 @@ class VideoRepository:
         query = query.order_by(VideoModel.timestamp.desc()).offset(skip).limit(limit)
 
         result = await self.session.execute(query)
-        return list(result.scalars().all())
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        return videos
 
     async def get_videos_by_frame_count_range(
         self,
@@ -306,23 +559,17 @@ class VideoRepository:
         limit: int = 100,
     ) -> List[VideoModel]:
         """Get videos within a specific frame count range."""
-        result = await self.session.execute(
-            select(VideoModel)
-            .order_by(VideoModel.timestamp.desc())
-            .offset(skip)
-            .limit(limit)
+        query = select(VideoModel).options(
+            selectinload(VideoModel.audio), undefer(VideoModel.frames)
         )
+        if min_frames is not None:
+            query = query.where(VideoModel.frame_count >= min_frames)
+        if max_frames is not None:
+            query = query.where(VideoModel.frame_count <= max_frames)
 
-        all_videos = list(result.scalars().all())
-        filtered_videos = []
-
-        for video in all_videos:
-            frame_count = (
-                len(cast(List[str], video.frames)) if video.frames is not None else 0
-            )
-            if (min_frames is None or frame_count >= min_frames) and (
-                max_frames is None or frame_count <= max_frames
-            ):
-                filtered_videos.append(video)
+        query = query.order_by(VideoModel.timestamp.desc()).offset(skip).limit(limit)
 
-        return filtered_videos
+        result = await self.session.execute(query)
+        videos = list(result.scalars().all())
+        await _load_frames(videos)
+        return videos
@@ -0,0 +1,56 @@
+"""Shared FastAPI dependencies for the API routers.
+
+Every router resolves its repositories through these factories, so there is
+one definition per repository and all of them share the request's database
+session through FastAPI's dependency cache.
+"""
+
+from database.database import get_db_session
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repository.audio_repository import AudioRepository
+from app.repository.image_repository import ImageRepository
+from app.repository.video_repository import VideoRepository
+
+
+async def get_image_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> ImageRepository:
+    """Dependency function to provide ImageRepository instance.
+
+    Args:
+        session: Database session from dependency injection
+
+    Returns:
+        ImageRepository: Repository instance for image operations
+    """
+    return ImageRepository(session)
+
+
+async def get_video_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> VideoRepository:
+    """Dependency function to provide VideoRepository instance.
+
+    Args:
+        session: Database session from dependency injection
+
+    Returns:
+        VideoRepository: Repository instance for video operations
+    """
+    return VideoRepository(session)
+
+
+async def get_audio_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> AudioRepository:
+    """Dependency function to provide AudioRepository instance.
+
+    Args:
+        session: Database session from dependency injection
+
+    Returns:
+        AudioRepository: Repository instance for audio operations
+    """
+    return AudioRepository(session)
@@ -1,9 +1,8 @@
 import os
-from database.database import get_db_session
+from database.database import async_session_maker
 from database.models import ImageModel, VideoModel, AudioModel
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from sqlalchemy import or_, select
-from sqlalchemy.ext.asyncio import AsyncSession
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -17,7 +16,7 @@ router = APIRouter()
 
 
 @router.get("/find")
-async def find_item(query: str, db: AsyncSession = Depends(get_db_session)):
+async def find_item(query: str):
     """
     Searches for an item in the database and returns a natural language response.
 
@@ -26,78 +25,79 @@ async def find_item(query: str, db: AsyncSession = Depends(get_db_session)):
 
     Args:
         query: The search term (e.g., "keys", "phone", "wallet").
-        db: The database session.
 
     Returns:
         A natural one-sentence response about the item's location.
     """
-    # Search for the query in the tags and description of images
-    image_stmt = (
-        select(ImageModel)
-        .where(
-            or_(
-                ImageModel.tags.contains(query),
-                ImageModel.description.ilike(f"%{query}%"),
+    # Hold a database connection only for the lookups, not for the Gemini call below
+    async with async_session_maker() as db:
+        # Search for the query in the tags and description of images
+        image_stmt = (
+            select(ImageModel)
+            .where(
+                or_(
+                    ImageModel.tags.contains(query),
+                    ImageModel.description.ilike(f"%{query}%"),
+                )
             )
+            .order_by(ImageModel.timestamp.desc())
+            .limit(1)
         )
-        .order_by(ImageModel.timestamp.desc())
-        .limit(1)
-    )
-
-    # Search for the query in the tags and description of videos
-    video_stmt = (
-        select(VideoModel)
-        .where(
-            or_(
-                VideoModel.tags.contains(query),
-                VideoModel.description.ilike(f"%{query}%"),
+
+        # Search for the query in the tags and description of videos
+        video_stmt = (
+            select(VideoModel)
+            .where(
+                or_(
+                    VideoModel.tags.contains(query),
+                    VideoModel.description.ilike(f"%{query}%"),
+                )
             )
+            .order_by(VideoModel.timestamp.desc())
+            .limit(1)
         )
-        .order_by(VideoModel.timestamp.desc())
-        .limit(1)
-    )
-
-    # Execute both queries
-    image_result = await db.execute(image_stmt)
-    video_result = await db.execute(video_stmt)
-
-    latest_image = image_result.scalar_one_or_none()
-    latest_video = video_result.scalar_one_or_none()
-
-    # Find the most recent between the two
-    candidates = []
-    if latest_image:
-        candidates.append(latest_image)
-    if latest_video:
-        candidates.append(latest_video)
-
-    most_recent = max(candidates, key=lambda x: x.timestamp) if candidates else None
-
-    if not most_recent:
-        raise HTTPException(status_code=404, detail=f"I could not find your {query}.")
-
-    # Gather context information
-    description = most_recent.description or "unknown scene"
-    tags_list = most_recent.tags if isinstance(most_recent.tags, list) else []
-    tags = ", ".join(str(tag) for tag in tags_list) if tags_list else "no specific tags"
-    media_type = "photo" if isinstance(most_recent, ImageModel) else "video"
-    timestamp = most_recent.timestamp.strftime("%B %d, %Y at %I:%M %p")
+
+        # Execute both queries
+        image_result = await db.execute(image_stmt)
+        video_result = await db.execute(video_stmt)
+
+        latest_image = image_result.scalar_one_or_none()
+        latest_video = video_result.scalar_one_or_none()
+
+        # Find the most recent between the two
+        candidates = []
+        if latest_image:
+            candidates.append(latest_image)
+        if latest_video:
+            candidates.append(latest_video)
+
+        most_recent = max(candidates, key=lambda x: x.timestamp) if candidates else None
+
+        if not most_recent:
+            raise HTTPException(status_code=404, detail=f"I could not find your {query}.")
+
+        # Gather context information
+        description = most_recent.description or "unknown scene"
+        tags_list = most_recent.tags if isinstance(most_recent.tags, list) else []
+        tags = ", ".join(str(tag) for tag in tags_list) if tags_list else "no specific tags"
+        media_type = "photo" if isinstance(most_recent, ImageModel) else "video"
+        timestamp = most_recent.timestamp.strftime("%B %d, %Y at %I:%M %p")
     
-    # Get location info if available
-    location_info = ""
-    if most_recent.latitude and most_recent.longitude:
-        location_info = f" at coordinates {most_recent.latitude}, {most_recent.longitude}"
+        # Get location info if available
+        location_info = ""
+        if most_recent.latitude and most_recent.longitude:
+            location_info = f" at coordinates {most_recent.latitude}, {most_recent.longitude}"
     
-    # Get audio transcript if available
-    audio_info = ""
-    if hasattr(most_recent, 'audio_id') and most_recent.audio_id:
-        audio_result = await db.execute(
-            select(AudioModel.transcription)
-            .where(AudioModel.id == most_recent.audio_id)
-        )
-        audio_transcription = audio_result.scalar_one_or_none()
-        if audio_transcription and audio_transcription.strip():
-            audio_info = f" Audio captured: '{audio_transcription.strip()}'"
+        # Get audio transcript if available
+        audio_info = ""
+        if hasattr(most_recent, 'audio_id') and most_recent.audio_id:
+            audio_result = await db.execute(
+                select(AudioModel.transcription)
+                .where(AudioModel.id == most_recent.audio_id)
+            )
+            audio_transcription = audio_result.scalar_one_or_none()
+            if audio_transcription and audio_transcription.strip():
+                audio_info = f" Audio captured: '{audio_transcription.strip()}'"
 
     # Create prompt for Gemini
     prompt = f"""
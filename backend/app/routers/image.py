@@ -7,51 +7,66 @@ This module handles image upload functionality, including:
 -    db: AsyncSession = Depends(get_db_session),Audio-based image search (placeholder)
 """
 
-import base64
-import os
-import uuid
+import asyncio
+import logging
 from typing import List, Optional
 
-from database.database import get_db_session
+from database.models import ImageModel
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from ulid import ULID
 
 from app.models.models import ImageInput, ImageResponse, ImageUpdate
 from app.repository.audio_repository import AudioRepository
 from app.repository.image_repository import ImageRepository
+from app.routers.dependencies import get_audio_repository, get_image_repository
 
-from ..utils.transcription import transcribe_audio_from_bytes
+from ..utils.background_worker import notify_new_images
+from ..utils.blob_store import image_store
+from ..utils.image_utils import pack_image_payload
+
+logger = logging.getLogger(__name__)
 
 # Create router with image-specific prefix and tags
 router = APIRouter(prefix="/image", tags=["image"])
 
 
-def get_image_repository(
-    session: AsyncSession = Depends(get_db_session),
-) -> ImageRepository:
-    """Dependency function to provide ImageRepository instance.
+def _store_images(frames: List[str]) -> List[str]:
+    """Decode base64 frames once and append them to the segment store.
 
     Args:
-        session: Database session from dependency injection
+        frames: Base64 encoded frames, optionally in data URL format
 
     Returns:
-        ImageRepository: Repository instance for image operations
+        List[str]: Segment references, in frame order
     """
-    return ImageRepository(session)
+    return [image_store.append(pack_image_payload(frame)) for frame in frames]
+
 
+def build_image_response(image: ImageModel) -> ImageResponse:
+    """Build an ImageResponse from a database row without re-running validation.
 
-def get_audio_repository(
-    session: AsyncSession = Depends(get_db_session),
-) -> AudioRepository:
-    """Dependency function to provide AudioRepository instance.
+    Rows coming back from the repository are already well-formed, so list
+    endpoints use ``model_construct`` instead of ``model_validate`` per row.
 
     Args:
-        session: Database session from dependency injection
+        image: ImageModel instance, optionally enriched with base64 data
 
     Returns:
-        AudioRepository: Repository instance for audio operations
+        ImageResponse: Response model populated from the row
     """
-    return AudioRepository(session)
+    return ImageResponse.model_construct(
+        id=image.id,
+        path=image.path,
+        image=getattr(image, "image", None),
+        timestamp=image.timestamp,
+        description=image.description,
+        tags=image.tags,
+        embeddings=image.embeddings,
+        tagged=image.tagged,
+        audio_id=image.audio_id,
+        latitude=image.latitude,
+        longitude=image.longitude,
+    )
 
 
 @router.post("/")
@@ -84,7 +99,7 @@ async def upload_image(
 
 
     try:
-        print("long lat:",data.longitude, data.latitude)
+        logger.debug("Upload location: %s, %s", data.latitude, data.longitude)
         transcription = data.transcript
 
         audio_record = await audio_repository.create_audio(transcription=transcription)
@@ -100,36 +115,39 @@ async def upload_image(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No image data provided"
         )
 
-    image_record = None
-    for image in data.frames:
-        image_id = str(uuid.uuid4())
-
-        filename = f"{image_id}.b64"
-        filepath = os.path.join("images", filename)
-
-        os.makedirs("images", exist_ok=True)
-
-        # Save base64 data to file system
-        with open(filepath, "w") as f:
-            f.write(image)
-
-        # Create image record in database with initial metadata
-        image_record = await repository.create_image(
-            path=filename,
-            description=None,  # No description initially
-            tags=[],  # Empty tags initially
-            embeddings=None,  # No embeddings initially
-            tagged=False,  # Not processed by AI yet
-            audio_id=audio_id,  # Reference to AudioModel ID
-            latitude=data.latitude,
-            longitude=data.longitude,
+    # Decode the frames and append their raw bytes to the shared segment file
+    # in a worker thread, so the file writes never block the event loop
+    paths = await asyncio.to_thread(_store_images, data.frames)
+
+    rows = []
+    for path in paths:
+        rows.append(
+            {
+                # ULIDs are timestamp-prefixed, so new rows land on the right-most
+                # pages of the primary key index instead of random ones
+                "id": str(ULID().to_uuid()),
+                "path": path,
+                "description": None,  # No description initially
+                "tags": [],  # Empty tags initially
+                "embeddings": None,  # No embeddings initially
+                "tagged": False,  # Not processed by AI yet
+                "audio_id": audio_id,  # Reference to AudioModel ID
+                "latitude": data.latitude,
+                "longitude": data.longitude,
+            }
         )
 
-    if image_record is None:
+    # Insert every frame of the upload in a single statement and transaction
+    images = await repository.create_images_bulk(rows)
+    if not images:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create image record",
         )
+    image_record = images[-1]
+
+    # Let the tagging worker pick up the new frames without waiting for its timeout
+    notify_new_images()
     return ImageResponse.model_validate(image_record)
 
 
@@ -148,12 +166,14 @@ async def get_images(
     else:
         images = await repository.get_all_images(skip=skip, limit=limit)
 
-    return [ImageResponse.model_validate(image) for image in images]
+    return [build_image_response(image) for image in images]
 
 
 @router.get("/images_by_transcript")
 async def get_images_by_transcript(
-    transcript: str, limit: int = 50, db: AsyncSession = Depends(get_db_session)
+    transcript: str,
+    limit: int = 50,
+    repository: ImageRepository = Depends(get_image_repository),
 ):
     """Search for images based on transcription using semantic similarity.
 
@@ -175,13 +195,12 @@ async def get_images_by_transcript(
         raise HTTPException(status_code=400, detail="Audio transcript cannot be empty")
 
     # Get images with similar audio embeddings
-    repo = ImageRepository(db)
-    images = await repo.get_images_by_audio(
+    images = await repository.get_images_by_audio(
         audio_description=transcript,
         limit=min(limit, 50),  # Cap limit at 50 for performance
     )
 
-    return [ImageResponse.model_validate(img) for img in images]
+    return [build_image_response(img) for img in images]
 
 
 @router.get("/{image_id}", response_model=ImageResponse)
@@ -236,9 +255,7 @@ async def delete_image(
 @router.get("/stats/counts")
 async def get_image_stats(repository: ImageRepository = Depends(get_image_repository)):
     """Get image statistics."""
-    total = await repository.count_images()
-    tagged = await repository.count_tagged_images()
-    untagged = await repository.count_untagged_images()
+    total, tagged, untagged = await repository.count_images_by_tagged()
 
     return {"total_images": total, "tagged_images": tagged, "untagged_images": untagged}
 
@@ -1,57 +1,48 @@
-import base64
+import logging
+import re
 from typing import List, Optional
 
-from database.database import get_db_session
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
-from app.models.models import VideoCreate, VideoResponse
+from app.models.models import VideoCreate, VideoResponse, VideoSummary
 from app.repository.audio_repository import AudioRepository
 from app.repository.video_repository import VideoRepository
-from app.utils.transcription import transcribe_audio_from_bytes
-from database.models import VideoModel
+from app.routers.dependencies import get_audio_repository, get_video_repository
+from database.models import FrameManifest, VideoModel
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/video", tags=["videos"])
 
+# Splits a comma-separated tag query and strips surrounding whitespace in one pass
+_TAG_SEP = re.compile(r"\s*,\s*")
+
 
-def get_video_repository(
-    session: AsyncSession = Depends(get_db_session),
-) -> VideoRepository:
-    return VideoRepository(session)
-
-
-def get_audio_repository(
-    session: AsyncSession = Depends(get_db_session),
-) -> AudioRepository:
-    return AudioRepository(session)
-
-
-async def build_video_response(
-    video: VideoModel, audio_repo: AudioRepository
-) -> VideoResponse:
-    """Build a VideoResponse with transcript included from AudioModel."""
-    transcript = None
-    if video.audio_id:
-        audio = await audio_repo.get_audio_by_id(video.audio_id)
-        if audio:
-            transcript = audio.transcription
-    
-    # Create response dict from video model
-    video_dict = {
-        "id": video.id,
-        "timestamp": video.timestamp,
-        "tagged": video.tagged,
-        "frames": video.frames,
-        "tags": video.tags,
-        "fps": video.fps,
-        "duration": video.duration,
-        "audio_id": video.audio_id,
-        "latitude": video.latitude,
-        "longitude": video.longitude,
-        "transcript": transcript,
-    }
-    
-    return VideoResponse(**video_dict)
+def build_video_response(video: VideoModel) -> VideoResponse:
+    """Build a VideoResponse with transcript included from AudioModel.
+
+    The video must have been loaded with its ``audio`` relationship
+    (the repository queries use selectinload for this). Rows coming back
+    from the repository are already well-formed, so the response is built
+    with ``model_construct`` instead of being validated again.
+    """
+    transcript = video.audio.transcription if video.audio else None
+
+    return VideoResponse.model_construct(
+        id=video.id,
+        timestamp=video.timestamp,
+        tagged=video.tagged,
+        frames=video.frames,
+        tags=video.tags,
+        fps=video.fps,
+        duration=video.duration,
+        audio_id=video.audio_id,
+        latitude=video.latitude,
+        longitude=video.longitude,
+        transcript=transcript,
+    )
 
 @router.get("/ids", response_model=List[str])
 async def get_video_ids(
@@ -63,81 +54,56 @@ async def get_video_ids(
 async def create_video(
     video_data: VideoCreate,
     video_repo: VideoRepository = Depends(get_video_repository),
-    audio_repo: AudioRepository = Depends(get_audio_repository),
 ):
     """Create a new video record with optional audio.
 
-    If audio is provided, it will be transcribed and stored in the audio table,
-    and the video will be linked to the audio record.
+    If a transcript is provided, it will be stored in the audio table and the
+    video will be linked to the audio record, both in one transaction. Its
+    embedding is generated later by the background worker.
     """
     try:
-        audio_id = None
-
-        # Handle audio if provided
-        if video_data.transcript:
-            try:
-                # Transcribe the audio
-                transcription = video_data.transcript
-
-                # Create audio record
-                audio = await audio_repo.create_audio(transcription=transcription)
-                audio_id = str(audio.id)
-            except Exception as e:
-                # Log the error but don't fail the video creation
-                print(f"Error processing audio: {str(e)}")
-
-        # Create video record
-        video = await video_repo.create_video(
+        video_fields = dict(
             tagged=video_data.tagged,
             frames=video_data.frames,
             tags=video_data.tags,
             fps=video_data.fps,
             duration=video_data.duration,
-            audio_id=audio_id,
             latitude=video_data.latitude,
             longitude=video_data.longitude,
         )
-        return await build_video_response(video, audio_repo)
+
+        # Create the video, together with its audio record if provided
+        if video_data.transcript:
+            video = await video_repo.create_video_with_audio(
+                transcription=video_data.transcript, **video_fields
+            )
+        else:
+            video = await video_repo.create_video(**video_fields)
+        return build_video_response(video)
     except Exception as e:
-        print(e)
+        logger.exception("Failed to create video")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create video: {str(e)}",
         )
 
 
-@router.get("/{video_id}", response_model=VideoResponse)
-async def get_video(
-    video_id: str, 
-    repository: VideoRepository = Depends(get_video_repository),
-    audio_repo: AudioRepository = Depends(get_audio_repository),
-):
-    """Get a video by ID."""
-    video = await repository.get_video_by_id(video_id)
-    if not video:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Video not found"
-        )
-    return await build_video_response(video, audio_repo)
-
-
-@router.get("/", response_model=List[VideoResponse])
+@router.get("/", response_model=List[VideoSummary])
 async def get_videos(
     skip: int = 0,
     limit: int = 100,
     tagged_only: Optional[bool] = None,
     repository: VideoRepository = Depends(get_video_repository),
-    audio_repo: AudioRepository = Depends(get_audio_repository),
 ):
-    """Get all videos with optional filtering."""
-    if tagged_only is True:
-        videos = await repository.get_tagged_videos(skip=skip, limit=limit)
-    elif tagged_only is False:
-        videos = await repository.get_untagged_videos(skip=skip, limit=limit)
-    else:
-        videos = await repository.get_all_videos(skip=skip, limit=limit)
+    """Get all videos with optional filtering.
 
-    return [await build_video_response(video, audio_repo) for video in videos]
+    Rows are serialized straight from the database with orjson; returning
+    the response directly skips ORM objects and response model validation.
+    Frames are not included; they are served by ``/video/{id}`` and the
+    frame endpoints.
+    """
+    rows = await repository.get_video_rows(skip=skip, limit=limit, tagged=tagged_only)
+    return ORJSONResponse(rows)
 
 
 @router.get("/search/by-tags", response_model=List[VideoResponse])
@@ -146,10 +112,10 @@ async def search_videos_by_tags(
     skip: int = 0,
     limit: int = 100,
     repository: VideoRepository = Depends(get_video_repository),
-    audio_repo: AudioRepository = Depends(get_audio_repository),
 ):
     """Search videos by tags."""
-    tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    # dict.fromkeys drops repeated tags while keeping their order
+    tag_list = list(dict.fromkeys(tag for tag in _TAG_SEP.split(tags.strip()) if tag))
     if not tag_list:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -157,7 +123,7 @@ async def search_videos_by_tags(
         )
 
     videos = await repository.search_videos_by_tags(tag_list, skip=skip, limit=limit)
-    return [await build_video_response(video, audio_repo) for video in videos]
+    return [build_video_response(video) for video in videos]
 
 
 @router.delete("/{video_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -175,9 +141,7 @@ async def delete_video(
 @router.get("/stats/counts")
 async def get_video_stats(repository: VideoRepository = Depends(get_video_repository)):
     """Get video statistics."""
-    total = await repository.count_videos()
-    tagged = await repository.count_tagged_videos()
-    untagged = await repository.count_untagged_videos()
+    total, tagged, untagged = await repository.count_videos_by_tagged()
 
     return {"total_videos": total, "tagged_videos": tagged, "untagged_videos": untagged}
 
@@ -210,16 +174,70 @@ async def get_videos_by_embedding(
         # Get audio IDs from the search results (extract audio from tuples)
         audio_ids = [str(audio.id) for audio, score in similar_audios_with_scores]
 
-        # Get videos that reference these audio IDs
-        videos = []
-        for audio_id in audio_ids:
-            video = await video_repo.get_video_by_audio_id(audio_id)
-            if video:
-                videos.append(video)
+        # Get videos that reference these audio IDs in a single query
+        videos = await video_repo.get_videos_by_audio_ids(audio_ids)
 
-        return [await build_video_response(video, audio_repo) for video in videos]
+        return [build_video_response(video) for video in videos]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to search videos by audio: {str(e)}",
         )
+
+
+# Declared last so the path parameter does not capture static paths such as
+# /videos_by_embedding
+@router.get("/{video_id}", response_model=VideoResponse)
+async def get_video(
+    video_id: str, 
+    repository: VideoRepository = Depends(get_video_repository),
+):
+    """Get a video by ID."""
+    video = await repository.get_video_by_id(video_id)
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Video not found"
+        )
+    return build_video_response(video)
+
+
+@router.get("/{video_id}/frames")
+async def stream_video_frames(
+    video_id: str,
+    repository: VideoRepository = Depends(get_video_repository),
+):
+    """Stream a video's frames as newline-delimited JSON, one frame per line.
+
+    Only the frame references are loaded up front; each frame is read from
+    the segment store and encoded as it is sent, so long clips are never
+    held in memory as a whole.
+    """
+    references = await repository.get_frame_references(video_id)
+    if references is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Video not found"
+        )
+    return StreamingResponse(
+        (orjson.dumps(FrameManifest.load_frame(ref)) + b"\n" for ref in references),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{video_id}/frames/{index}")
+async def get_video_frame(
+    video_id: str,
+    index: int,
+    repository: VideoRepository = Depends(get_video_repository),
+):
+    """Get a single video frame as an image.
+
+    Only the requested frame is read, and it is returned as raw image bytes
+    instead of base64.
+    """
+    frame = await repository.get_video_frame(video_id, index)
+    if frame is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Frame not found"
+        )
+    data, mime_type = frame
+    return Response(content=data, media_type=mime_type)
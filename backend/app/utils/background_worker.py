@@ -1,15 +1,48 @@
 import asyncio
+import logging
+import time
+from typing import Dict, Tuple
 
 from database.database import async_session_maker
 
+from app.repository.audio_repository import AudioRepository
 from app.repository.image_repository import ImageRepository
-from app.utils.tagging import get_image_tags_batch_as_parts
+from app.utils.embedding import generate_text_embedding
+from app.utils.tagging import get_image_tags_batch_as_parts_async
+
+logger = logging.getLogger(__name__)
+
+# Longest the tagging worker waits for an upload before checking anyway
+TAGGING_IDLE_TIMEOUT = 60
+
+# Set by the upload endpoint so the tagging worker wakes up right away
+_new_images = asyncio.Event()
+
+# Delay before retrying an audio record whose embedding failed; doubles with
+# every failed attempt up to the maximum
+EMBEDDING_RETRY_DELAY = 30
+EMBEDDING_RETRY_MAX_DELAY = 3600
+
+# Audio ID -> (failed attempts, monotonic time of the next retry)
+_embedding_failures: Dict[str, Tuple[int, float]] = {}
+
+
+def notify_new_images() -> None:
+    """Wake the tagging worker after new untagged images are stored."""
+    _new_images.set()
 
 
 async def fire_image_tagging_worker():
-    """Worker that tags images every 15 seconds."""
+    """Worker that tags untagged images whenever new ones are uploaded.
+
+    Each run drains the backlog batch by batch, fetching the next batch
+    while the current one is being tagged. Without uploads it still checks
+    every TAGGING_IDLE_TIMEOUT seconds to retry failed batches.
+    """
     while True:
-        print("Worker running - 15 second interval")
+        # Cleared before fetching so uploads during this run trigger another
+        _new_images.clear()
+        logger.debug("Tagging worker running")
 
         try:
             # Get database session
@@ -21,42 +54,120 @@ async def fire_image_tagging_worker():
                     limit=10
                 )  # Process in batches
 
-                if untagged_images:
-                    print(f"Found {len(untagged_images)} untagged images to process")
+                if not untagged_images:
+                    logger.debug("No untagged images found")
+
+                while untagged_images:
+                    logger.info("Found %d untagged images to process", len(untagged_images))
 
                     # Extract image paths for batch processing
                     image_paths = [str(image.path) for image in untagged_images]
 
-                    # Run image tagging on them
-                    tagging_results = get_image_tags_batch_as_parts(image_paths)
-
-                    if "error" not in tagging_results:
-                        # Process results and update database
-                        batch_results = tagging_results.get("batch_results", [])
+                    # Tag this batch while the next batch is fetched
+                    tagging_results, next_images = await asyncio.gather(
+                        get_image_tags_batch_as_parts_async(image_paths),
+                        repository.get_untagged_images(
+                            limit=10,
+                            exclude_ids=[str(image.id) for image in untagged_images],
+                        ),
+                    )
+
+                    if "error" in tagging_results:
+                        # Leave the rest for the next run
+                        logger.warning("Error in tagging: %s", tagging_results["error"])
+                        break
+
+                    # Process results and update database
+                    batch_results = tagging_results.get("batch_results", [])
+                    if not batch_results:
+                        break
+
+                    # Results only cover the images that loaded, so pair them by
+                    # the returned paths; images without a result stay untagged
+                    columns = tagging_results["batch_results_soa"]
+                    images_by_path = {str(image.path): image for image in untagged_images}
+                    updates = [
+                        {
+                            "id": str(images_by_path[path].id),
+                            "tags": tags or [],
+                            "description": description or "",
+                            "tagged": True,
+                        }
+                        for path, tags, description in zip(
+                            tagging_results["image_paths"],
+                            columns["tags"],
+                            columns["description"],
+                        )
+                        if path in images_by_path
+                    ]
+
+                    # Update all images in the database at once
+                    await repository.update_images_bulk(updates)
+
+                    logger.info("Successfully tagged %d images", len(updates))
+                    untagged_images = next_images
+
+        except Exception:
+            logger.exception("Error in background worker")
 
-                        for i, result in enumerate(batch_results):
-                            if i < len(untagged_images):
-                                image = untagged_images[i]
-
-                                # Extract tags and description from result
-                                tags = result.get("tags", [])
-                                description = result.get("description", "")
-
-                                # Update the image in database
-                                await repository.update_image(
-                                    image_id=str(image.id),
-                                    tags=tags,
-                                    description=description,
-                                    tagged=True,
-                                )
-
-                        print(f"Successfully tagged {len(batch_results)} images")
-                    else:
-                        print(f"Error in tagging: {tagging_results['error']}")
-                else:
-                    print("No untagged images found")
-
-        except Exception as e:
-            print(f"Error in background worker: {e}")
-
-        await asyncio.sleep(15)
+        try:
+            await asyncio.wait_for(_new_images.wait(), timeout=TAGGING_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _record_embedding_failure(audio_id: str) -> None:
+    """Back off from an audio record whose embedding could not be generated."""
+    attempts = _embedding_failures.get(audio_id, (0, 0.0))[0] + 1
+    delay = min(EMBEDDING_RETRY_DELAY * 2 ** (attempts - 1), EMBEDDING_RETRY_MAX_DELAY)
+    _embedding_failures[audio_id] = (attempts, time.monotonic() + delay)
+    logger.warning(
+        "Embedding failed for audio %s (attempt %d), retrying in %ds",
+        audio_id,
+        attempts,
+        delay,
+    )
+
+
+async def fire_audio_embedding_worker():
+    """Worker that embeds new audio transcriptions every 5 seconds.
+
+    Records whose embedding fails are skipped until their backoff expires,
+    so they cannot keep newer audio out of the batch.
+    """
+    while True:
+        try:
+            async with async_session_maker() as session:
+                repository = AudioRepository(session)
+
+                # Transcriptions saved by the upload endpoints without an
+                # embedding, minus the ones still backing off
+                now = time.monotonic()
+                backing_off = [
+                    audio_id
+                    for audio_id, (_, retry_at) in _embedding_failures.items()
+                    if retry_at > now
+                ]
+                pending_audio = await repository.get_audio_without_embedding(
+                    limit=10, exclude_ids=backing_off
+                )
+
+                if pending_audio:
+                    logger.info("Found %d audio records to embed", len(pending_audio))
+
+                    for audio in pending_audio:
+                        audio_id = str(audio.id)
+                        # The embedding call blocks, so keep it off the event loop
+                        embedding = await asyncio.to_thread(
+                            generate_text_embedding, str(audio.transcription)
+                        )
+                        if embedding:
+                            await repository.set_audio_embedding(audio_id, embedding)
+                            _embedding_failures.pop(audio_id, None)
+                        else:
+                            _record_embedding_failure(audio_id)
+
+        except Exception:
+            logger.exception("Error in audio embedding worker")
+
+        await asyncio.sleep(5)
@@ -0,0 +1,171 @@
+"""Append-only segment storage for uploaded image payloads.
+
+Instead of creating one file per uploaded frame, payloads are appended to a
+small number of large segment files inside the images directory. Each stored
+payload is addressed by a reference of the form ``<segment>:<offset>:<length>``
+which is what gets persisted in ``ImageModel.path``.
+
+Plain file names (the legacy one-file-per-frame layout) are still readable so
+existing rows keep working.
+"""
+
+import mmap
+import os
+import re
+import threading
+from typing import Optional
+
+IMAGES_DIR = "images"
+
+# Start a new segment once the current one grows past this size
+SEGMENT_MAX_BYTES = 1 << 30  # 1 GiB
+
+# Payloads at least this large bypass the page cache with O_DIRECT (Linux only)
+DIRECT_IO_THRESHOLD = 1 << 20  # 1 MiB
+DIRECT_IO_ALIGNMENT = 4096
+
+
+# <segment>:<offset>:<length>; base64 data and data URLs never match this
+_SEGMENT_REFERENCE = re.compile(r"[^:/]+:\d+:\d+")
+
+
+def is_segment_reference(value: str) -> bool:
+    """Check whether a string is a segment reference rather than inline data."""
+    return _SEGMENT_REFERENCE.fullmatch(value) is not None
+
+
+def _align_up(value: int, alignment: int = DIRECT_IO_ALIGNMENT) -> int:
+    return (value + alignment - 1) & ~(alignment - 1)
+
+
+class SegmentStore:
+    """Append payloads to rotating segment files.
+
+    Segment names include the process id so multiple server workers never
+    append to the same file.
+
+    Attributes:
+        directory: Directory holding the segment files
+        max_bytes: Size at which the active segment is rotated
+    """
+
+    def __init__(self, directory: str = IMAGES_DIR, max_bytes: int = SEGMENT_MAX_BYTES):
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding the segment files
+            max_bytes: Size at which the active segment is rotated
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._rotation = 0
+        self._segment = None
+        self._segment_name = ""
+        self._size = 0
+        # Cleared after the first failure, e.g. on filesystems without O_DIRECT
+        self._direct_io = hasattr(os, "O_DIRECT")
+
+    def _open_segment(self) -> None:
+        """Open the next segment file with room left for appends."""
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            name = f"seg-{os.getpid()}-{self._rotation}.blob"
+            segment = open(os.path.join(self.directory, name), "ab")
+            if segment.tell() < self.max_bytes:
+                break
+            # Left over from an earlier process with the same pid and already full
+            segment.close()
+            self._rotation += 1
+        self._segment = segment
+        self._segment_name = name
+        self._size = segment.tell()
+
+    def _write_direct(self, data: bytes, offset: int) -> bool:
+        """Write a payload at an aligned offset with O_DIRECT.
+
+        Large uploads are not read back soon, so copying them through the
+        page cache only costs memory bandwidth.
+
+        Args:
+            data: Raw payload bytes
+            offset: Block-aligned offset in the active segment
+
+        Returns:
+            bool: True if the write went through, False to fall back to buffered I/O
+        """
+        length = _align_up(len(data))
+        # Anonymous mmaps are page aligned, as O_DIRECT requires
+        buffer = mmap.mmap(-1, length)
+        try:
+            buffer[: len(data)] = data
+            fd = os.open(
+                os.path.join(self.directory, self._segment_name),
+                os.O_WRONLY | os.O_DIRECT,
+            )
+            try:
+                os.pwrite(fd, buffer, offset)
+            finally:
+                os.close(fd)
+            return True
+        except OSError:
+            self._direct_io = False
+            return False
+        finally:
+            buffer.close()
+
+    def append(self, data: bytes) -> str:
+        """Append a payload to the active segment.
+
+        Args:
+            data: Raw payload bytes
+
+        Returns:
+            str: Reference to the stored payload, suitable for ``ImageModel.path``
+        """
+        with self._lock:
+            if self._segment is None or self._size >= self.max_bytes:
+                if self._segment is not None:
+                    self._segment.close()
+                    self._rotation += 1
+                self._open_segment()
+
+            if self._direct_io and len(data) >= DIRECT_IO_THRESHOLD:
+                offset = _align_up(self._size)
+                if self._write_direct(data, offset):
+                    # The padding up to the next block is never referenced
+                    self._size = offset + _align_up(len(data))
+                    return f"{self._segment_name}:{offset}:{len(data)}"
+
+            offset = self._size
+            self._segment.write(data)
+            self._segment.flush()
+            self._size += len(data)
+            return f"{self._segment_name}:{offset}:{len(data)}"
+
+
+def read_blob(path: str) -> Optional[bytes]:
+    """Read a stored payload.
+
+    Args:
+        path: Segment reference or legacy file name relative to the images directory
+
+    Returns:
+        Payload bytes, or None if it cannot be read
+    """
+    try:
+        parts = path.rsplit(":", 2)
+        if len(parts) == 3:
+            segment_name, offset, length = parts
+            with open(os.path.join(IMAGES_DIR, segment_name), "rb") as f:
+                f.seek(int(offset))
+                return f.read(int(length))
+
+        with open(os.path.join(IMAGES_DIR, path), "rb") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+# Shared store used by the upload endpoint
+image_store = SegmentStore()
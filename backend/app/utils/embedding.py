@@ -1,41 +1,209 @@
 # cspell:disable-next-line
-from typing import List, Optional
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 from google import genai
 
 from dotenv import load_dotenv
 
+from .gemini import create_client
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+EMBEDDING_MODEL = "gemini-embedding-001"
+
+# Content-addressed store of generated embeddings, so identical texts are
+# only ever sent to the embedding API once
+EMBEDDING_CACHE_PATH = "database/embedding_cache.db"
+
+_cache_local = threading.local()
+
+
+def _cache_connection() -> sqlite3.Connection:
+    """Return this thread's connection to the embedding cache."""
+    conn = getattr(_cache_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(EMBEDDING_CACHE_PATH, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        _cache_local.conn = conn
+    return conn
+
+
+def _cache_key(text: str, model: str = EMBEDDING_MODEL) -> bytes:
+    return hashlib.blake2b(f"{model}\x00{text}".encode(), digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> Optional[List[float]]:
+    try:
+        row = _cache_connection().execute(
+            "SELECT vector FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Embedding cache lookup failed: %s", e)
+        return None
+    return np.frombuffer(row[0], dtype=np.float32).tolist() if row else None
+
+
+def _cache_put(key: bytes, embedding: List[float]) -> None:
+    try:
+        conn = _cache_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                (key, np.asarray(embedding, dtype=np.float32).tobytes()),
+            )
+    except sqlite3.Error as e:
+        logger.warning("Embedding cache write failed: %s", e)
+
+
+@lru_cache(maxsize=1)
+def _client() -> genai.Client:
+    """Return the shared Gemini client so its connection pool is reused."""
+    return create_client()
+
+
+def _normalize(embedding: Sequence[float]) -> List[float]:
+    """Scale an embedding to unit length; all-zero vectors are returned as is."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.sqrt(np.vdot(vector, vector))
+    if norm == 0.0:
+        return vector.tolist()
+    return (vector / norm).tolist()
+
 
 def generate_text_embedding(text: str) -> Optional[List[float]]:
     """Generate text embeddings using Google Gemini.
 
+    Embeddings are L2-normalized, so the cosine similarity of two of them is
+    just their dot product. Results are kept in an on-disk cache keyed by a
+    BLAKE2 hash of the model and text, so repeated texts skip the API call.
+
     Args:
         text: The text content to embed
 
     Returns:
-        List[float]: The embedding vector, or None if embedding fails
+        List[float]: The unit-length embedding vector, or None if embedding fails
     """
     if not text or not text.strip():
         return None
 
+    text = text.strip()
+    key = _cache_key(text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
     try:
-        client = genai.Client()
-        result = client.models.embed_content(
-            model="gemini-embedding-001", contents=text.strip()
-        )
+        result = _client().models.embed_content(model=EMBEDDING_MODEL, contents=text)
         # Extract the embedding values from ContentEmbedding objects
         if result.embeddings and len(result.embeddings) > 0:
-            return result.embeddings[0].values
+            embedding = _normalize(result.embeddings[0].values)
+            _cache_put(key, embedding)
+            return embedding
         return None
     except Exception as e:
-        print(f"Error generating embedding: {str(e)}")
+        logger.warning("Error generating embedding: %s", e)
+        return None
+
+
+# Number of distinct search queries whose embeddings are kept in memory
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# Embeddings of recent search queries by cache key, least recently used first
+_query_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+# Runs of whitespace are collapsed so differently spaced queries share an entry
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _query_cache_key(query: str) -> str:
+    """Cache key of a query; only whitespace is normalized, case is kept."""
+    return _WHITESPACE.sub(" ", query).strip() if query else ""
+
+
+def _cached_query_embedding(query: str) -> Optional[List[float]]:
+    """Return the embedding cached under a query's key, if any."""
+    with _query_cache_lock:
+        embedding = _query_cache.get(query)
+        if embedding is None:
+            return None
+        _query_cache.move_to_end(query)
+    return list(embedding)
+
+
+def _store_query_embedding(query: str, embedding: List[float]) -> None:
+    """Remember a query embedding, evicting the least recently used ones."""
+    with _query_cache_lock:
+        _query_cache[query] = tuple(embedding)
+        _query_cache.move_to_end(query)
+        while len(_query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+
+
+def generate_query_embedding(query: str) -> Optional[List[float]]:
+    """Generate an embedding for a search query, reusing earlier results.
+
+    Search queries repeat often, so embeddings are cached in memory to skip
+    the embedding API round-trip on repeats. The cache key collapses
+    whitespace, but the query itself is embedded exactly as given. Failed
+    lookups are not cached and are retried on the next call.
+
+    Args:
+        query: The search query to embed
+
+    Returns:
+        List[float]: The embedding vector, or None if embedding fails
+    """
+    key = _query_cache_key(query)
+    if not key:
         return None
 
+    cached = _cached_query_embedding(key)
+    if cached is not None:
+        return cached
+
+    embedding = generate_text_embedding(query)
+    if embedding is not None:
+        _store_query_embedding(key, embedding)
+    return embedding
+
+
+async def generate_query_embedding_async(query: str) -> Optional[List[float]]:
+    """Generate an embedding for a search query without blocking the event loop.
+
+    Cached queries are answered directly; only a cache miss moves the
+    blocking embedding API call to a worker thread.
+
+    Args:
+        query: The search query to embed
+
+    Returns:
+        List[float]: The embedding vector, or None if embedding fails
+    """
+    cached = _cached_query_embedding(_query_cache_key(query))
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(generate_query_embedding, query)
+
 
 def calculate_cosine_similarity(
-    embedding1: List[float], embedding2: List[float]
+    embedding1: Sequence[float], embedding2: Sequence[float]
 ) -> float:
     """Calculate cosine similarity between two embedding vectors.
 
@@ -50,20 +218,102 @@ def calculate_cosine_similarity(
         return 0.0
 
     try:
-        import math
-
-        # Calculate dot product
-        dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
+        a = np.asarray(embedding1, dtype=np.float32)
+        b = np.asarray(embedding2, dtype=np.float32)
 
-        # Calculate magnitudes
-        magnitude1 = math.sqrt(sum(a * a for a in embedding1))
-        magnitude2 = math.sqrt(sum(b * b for b in embedding2))
+        # vdot of a vector with itself is its squared magnitude
+        denominator = np.sqrt(np.vdot(a, a) * np.vdot(b, b))
 
         # Avoid division by zero
-        if magnitude1 == 0.0 or magnitude2 == 0.0:
+        if denominator == 0.0:
             return 0.0
 
-        return dot_product / (magnitude1 * magnitude2)
+        return float(np.dot(a, b) / denominator)
     except Exception as e:
-        print(f"Error calculating cosine similarity: {str(e)}")
+        logger.warning("Error calculating cosine similarity: %s", e)
         return 0.0
+
+
+def cosine_similarity_normalized(
+    embedding1: Sequence[float], embedding2: Sequence[float]
+) -> float:
+    """Cosine similarity of two unit-length embeddings.
+
+    Args:
+        embedding1: First L2-normalized embedding vector
+        embedding2: Second L2-normalized embedding vector of the same length
+
+    Returns:
+        float: Cosine similarity score between -1 and 1, 0.0 if the lengths differ
+    """
+    if len(embedding1) != len(embedding2):
+        return 0.0
+
+    a = np.asarray(embedding1, dtype=np.float32)
+    b = np.asarray(embedding2, dtype=np.float32)
+    # Clip float32 rounding just past +/-1
+    return float(np.clip(np.dot(a, b), -1.0, 1.0))
+
+
+def cosine_similarity_matrix(
+    queries: Sequence[Sequence[float]], embeddings: Sequence[Sequence[float]]
+) -> np.ndarray:
+    """Cosine similarity of every query against every embedding at once.
+
+    Args:
+        queries: L2-normalized query vectors
+        embeddings: L2-normalized embedding vectors with the queries' length
+
+    Returns:
+        np.ndarray: Matrix of shape (len(queries), len(embeddings)) with scores
+        between -1 and 1
+    """
+    query_matrix = np.asarray(queries, dtype=np.float32)
+    matrix = np.asarray(embeddings, dtype=np.float32).reshape(
+        -1, query_matrix.shape[1]
+    )
+    scores = query_matrix @ matrix.T
+    # Clip in place so the scores are not copied into a second array
+    return np.clip(scores, -1.0, 1.0, out=scores)
+
+
+def cosine_topk(
+    query_embedding: Sequence[float], embeddings: Sequence[Sequence[float]], k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the k embeddings most similar to a query.
+
+    Scores every candidate with one matrix-vector product and selects the
+    best k with ``np.argpartition``, so only those k are fully sorted.
+
+    Args:
+        query_embedding: L2-normalized query vector
+        embeddings: L2-normalized candidate vectors with the query's length
+        k: Maximum number of matches to return
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indices into ``embeddings`` and their
+        similarity scores, highest score first
+    """
+    scores = cosine_similarity_matrix([query_embedding], embeddings)[0]
+    top = top_k_indices(scores, k)
+    return top, scores[top]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, highest first.
+
+    Uses ``np.argpartition`` so only the selected k are fully sorted.
+
+    Args:
+        scores: One-dimensional array of scores
+        k: Maximum number of indices to return
+
+    Returns:
+        np.ndarray: Indices into ``scores``
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
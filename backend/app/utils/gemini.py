@@ -0,0 +1,61 @@
+"""Shared construction of Google Gemini clients.
+
+Each client owns one sync and one async httpx connection pool, so the
+modules that talk to Gemini keep a single long-lived client and build it
+here with explicit keep-alive limits.
+"""
+
+from typing import Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+# Connections kept open to the Gemini API for reuse across requests
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 64
+
+
+def create_client(api_key: Optional[str] = None) -> genai.Client:
+    """Create a Gemini client with pooled keep-alive connections.
+
+    Args:
+        api_key: API key to use; when None the SDK reads GOOGLE_API_KEY
+
+    Returns:
+        genai.Client: Client whose sync and async transports reuse connections
+    """
+    pool = {
+        "limits": httpx.Limits(
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=MAX_CONNECTIONS,
+        )
+    }
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(client_args=pool, async_client_args=pool),
+    )
+
+
+def response_text(response: types.GenerateContentResponse) -> Optional[str]:
+    """Return the text of a ``generate_content`` response.
+
+    Single-part answers, the common case, are read straight from the part;
+    ``response.text`` walks and joins every part on each access, so it is
+    only used as the fallback for multi-part responses.
+
+    Args:
+        response: Response returned by ``generate_content``
+
+    Returns:
+        str: Response text, or None if the response has no text
+    """
+    candidates = response.candidates
+    if candidates and len(candidates) == 1:
+        content = candidates[0].content
+        parts = content.parts if content else None
+        if parts and len(parts) == 1:
+            part = parts[0]
+            if isinstance(part.text, str) and not part.thought:
+                return part.text
+    return response.text
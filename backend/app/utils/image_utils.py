@@ -1,6 +1,110 @@
-import base64
+import mmap
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+import pybase64
+
+# Stored image payloads starting with this byte hold decoded image bytes laid
+# out as <marker><data URL header><marker><raw bytes>. Base64 text never
+# contains a NUL byte, so anything else is a legacy base64 payload.
+RAW_PAYLOAD_MARKER = b"\0"
+
+DEFAULT_IMAGE_MIME = "image/jpeg"
+
+
+def _split_data_url(base64_string: str) -> Tuple[str, str]:
+    """Split an optional data URL header from base64 image data.
+
+    Args:
+        base64_string: Base64 data, optionally prefixed with "data:<mime>;base64,"
+
+    Returns:
+        Tuple of the header (empty if there was none) and the base64 data
+    """
+    if base64_string.startswith("data:"):
+        header, data = base64_string.split(",", 1)
+        return header, data
+    return "", base64_string
+
+
+def _header_mime(header: str) -> str:
+    """Extract the mime type from a data URL header, with a JPEG default."""
+    if not header:
+        return DEFAULT_IMAGE_MIME
+    return header.split(":", 1)[1].split(";", 1)[0] or DEFAULT_IMAGE_MIME
+
+
+def pack_image_payload(base64_string: str) -> bytes:
+    """Decode an uploaded base64 image once into the stored payload format.
+
+    Data that is not valid base64 is stored unchanged, as legacy payloads were.
+
+    Args:
+        base64_string: Uploaded base64 data, optionally in data URL format
+
+    Returns:
+        bytes: Payload to append to the image store
+    """
+    try:
+        header, data = _split_data_url(base64_string.strip())
+        # Line breaks are allowed in base64 text; any other character outside
+        # the alphabet makes the data invalid rather than being skipped
+        image_bytes = pybase64.b64decode("".join(data.split()), validate=True)
+    except ValueError:
+        return base64_string.encode()
+    return RAW_PAYLOAD_MARKER + header.encode() + RAW_PAYLOAD_MARKER + image_bytes
+
+
+def _raw_header_end(payload: bytes) -> int:
+    """Index of the marker that ends the header of a raw payload."""
+    return payload.index(RAW_PAYLOAD_MARKER, len(RAW_PAYLOAD_MARKER))
+
+
+def unpack_image_payload(payload: bytes) -> Tuple[bytes, str]:
+    """Get the image bytes and mime type from a stored payload.
+
+    Only the short header is scanned; the image data is sliced out at its
+    known offset, and legacy base64 is decoded in place without stripping
+    or splitting the whole buffer.
+
+    Args:
+        payload: Payload read from the image store
+
+    Returns:
+        Tuple of the raw image bytes and their mime type
+    """
+    if payload.startswith(RAW_PAYLOAD_MARKER):
+        header_end = _raw_header_end(payload)
+        header = payload[len(RAW_PAYLOAD_MARKER) : header_end].decode()
+        return payload[header_end + 1 :], _header_mime(header)
+
+    # Legacy payload stored as base64 text. The decoder skips the surrounding
+    # whitespace, so only a data URL header has to be located.
+    header = ""
+    data = memoryview(payload)
+    if payload.startswith(b"data:"):
+        comma = payload.index(b",")
+        header = payload[:comma].decode()
+        data = data[comma + 1 :]
+    return pybase64.b64decode(data, validate=False), _header_mime(header)
+
+
+def payload_to_base64(payload: bytes) -> str:
+    """Render a stored payload as the base64 string returned by the API.
+
+    Args:
+        payload: Payload read from the image store
+
+    Returns:
+        str: Base64 image data, in data URL format if it was uploaded that way
+    """
+    if payload.startswith(RAW_PAYLOAD_MARKER):
+        header_end = _raw_header_end(payload)
+        header = payload[len(RAW_PAYLOAD_MARKER) : header_end].decode()
+        data = pybase64.b64encode(memoryview(payload)[header_end + 1 :]).decode("ascii")
+        return f"{header},{data}" if header else data
+    return payload.decode().strip()
 
 
 def image_to_base64(image_path: str) -> Optional[str]:
@@ -18,18 +122,20 @@ def image_to_base64(image_path: str) -> Optional[str]:
         Exception: For other conversion errors
     """
     try:
-        # Check if file exists
-        if not Path(image_path).exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-
-        # Read the image file in binary mode
+        # open() raises FileNotFoundError for a missing file, so there is no
+        # separate exists() check; the size comes from the open descriptor
         with open(image_path, "rb") as image_file:
-            # Encode the binary data to base64
-            base64_encoded = base64.b64encode(image_file.read())
-            # Convert bytes to string
-            base64_string = base64_encoded.decode("utf-8")
+            size = os.fstat(image_file.fileno()).st_size
+            if size == 0:
+                return ""
+
+            # Encode straight from a read-only mapping of the file, so the image
+            # is never copied into an intermediate bytes object
+            with mmap.mmap(image_file.fileno(), size, access=mmap.ACCESS_READ) as buf:
+                base64_encoded = pybase64.b64encode(buf)
 
-        return base64_string
+        # Base64 output is pure ASCII, which decodes faster than UTF-8
+        return base64_encoded.decode("ascii")
 
     except FileNotFoundError:
         raise
@@ -63,7 +169,7 @@ def base64_to_image(base64_string: str, output_path: str) -> bool:
             base64_data = base64_string
 
         # Decode the base64 string to binary data
-        image_data = base64.b64decode(base64_data)
+        image_data = pybase64.b64decode(base64_data, validate=False)
 
         # Create directory if it doesn't exist
         output_dir = Path(output_path).parent
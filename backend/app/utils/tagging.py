@@ -7,21 +7,283 @@ This module provides functionality for:
 - Structured JSON output for consistent data processing
 """
 
-import base64
-import json
+import asyncio
+import hashlib
+import logging
 import os
-from typing import Any, Dict, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-# cspell:disable-next-line
+import orjson
 from dotenv import load_dotenv
 
 # cspell:disable-next-line
 from google import genai
 from google.genai import types
-from PIL import ImageFile
 
-# Enable loading of truncated images to prevent PIL errors with API processing
-ImageFile.LOAD_TRUNCATED_IMAGES = True
+from .blob_store import read_blob
+from .gemini import create_client, response_text
+from .image_utils import unpack_image_payload
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+# Gemini model used to tag image batches
+TAGGING_MODEL = "gemini-1.5-flash"
+
+# Prompt that specifies the exact JSON structure we want; filled in with
+# str.format once per request
+_PROMPT_TEMPLATE = """
+    Analyze these {n} images and provide detailed information about each one.
+    
+    Return ONLY a valid JSON array with one object per image, where each object has this exact structure:
+    
+    {{
+      "image_index": <index of image starting from 0>,
+      "tags": [<up to {max_tags} descriptive tags as strings>],
+      "objects": [
+        {{
+          "name": "<object name>",
+          "location": "<location in image>"
+        }}
+      ],
+      "scene_type": "<type of scene: indoor, outdoor, urban, nature, etc.>",
+      "colors": [<dominant colors as strings>],
+      "description": "<brief description of image content>"
+    }}
+    
+    Only respond with the raw JSON array, with no markdown formatting, no code blocks, no explanations.
+    The response must start with '[' and end with ']' and be valid JSON that can be parsed directly.
+    """
+
+# Fields of a per-image tagging result, in the column form of a batch
+RESULT_FIELDS = (
+    "image_index",
+    "tags",
+    "objects",
+    "scene_type",
+    "colors",
+    "description",
+)
+
+# Number of tagging results kept for reuse on byte-identical images, such as
+# repeated video frames or re-uploaded photos
+TAG_CACHE_SIZE = 4096
+
+_tag_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_tag_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _client(api_key: str) -> genai.Client:
+    """Return the shared Gemini client for an API key.
+
+    Building a client sets up credentials and an HTTP connection pool, so one
+    instance is reused across tagging batches.
+    """
+    return create_client(api_key)
+
+
+def _load_part(img_path: str) -> Tuple[str, Optional[types.Part], bytes]:
+    """Read one stored image payload and wrap it as a Gemini content part.
+
+    Args:
+        img_path: Image store reference of the payload
+
+    Returns:
+        Tuple of the path, its part (None if the image could not be loaded)
+        and a hash of the image bytes used as the tag cache key
+    """
+    try:
+        stored = read_blob(img_path)
+        if stored is None:
+            raise FileNotFoundError(f"Image data not found: {img_path}")
+
+        # New uploads are stored as raw bytes; only legacy payloads need decoding
+        image_bytes, mime_type = unpack_image_payload(stored)
+        key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        return (
+            img_path,
+            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+            key,
+        )
+    except Exception as e:
+        logger.warning("Error loading image %s: %s", img_path, e)
+        return img_path, None, b""
+
+
+def _cached_tags(key: bytes) -> Optional[Dict[str, Any]]:
+    """Return the tagging result of an identical image seen before, if any."""
+    with _tag_cache_lock:
+        result = _tag_cache.get(key)
+        if result is not None:
+            _tag_cache.move_to_end(key)
+        return result
+
+
+def _store_tags(key: bytes, result: Dict[str, Any]) -> None:
+    """Remember a tagging result, evicting the least recently used ones."""
+    with _tag_cache_lock:
+        _tag_cache[key] = result
+        _tag_cache.move_to_end(key)
+        while len(_tag_cache) > TAG_CACHE_SIZE:
+            _tag_cache.popitem(last=False)
+
+
+def _plan_batch(
+    loaded: Iterable[Tuple[str, Optional[types.Part], bytes]],
+) -> Tuple[
+    List[Tuple[str, bytes, Optional[Dict[str, Any]]]],
+    List[Tuple[str, Optional[types.Part], bytes]],
+]:
+    """Split loaded images into ones with cached tags and ones to send to Gemini.
+
+    Args:
+        loaded: Results of ``_load_part`` in the original image order
+
+    Returns:
+        Tuple of the (path, key, cached result or None) entries for every image
+        that loaded, in order, and the loaded images that still need tagging
+    """
+    plan = []
+    pending = []
+    for entry in loaded:
+        img_path, part, key = entry
+        if part is None:
+            continue
+        cached = _cached_tags(key)
+        plan.append((img_path, key, cached))
+        if cached is None:
+            pending.append(entry)
+    return plan, pending
+
+
+def _merge_results(
+    plan: List[Tuple[str, bytes, Optional[Dict[str, Any]]]],
+    fresh_results: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Combine cached results with fresh Gemini results in the original order.
+
+    Fresh results are cached for later duplicates. If Gemini returned fewer
+    results than images sent, the batch stops at the first missing one.
+
+    Args:
+        plan: Entries returned by ``_plan_batch``
+        fresh_results: Gemini results for the images without cached tags
+
+    Returns:
+        Dict with ``batch_results``, its column form ``batch_results_soa``
+        and ``image_paths``
+    """
+    fresh = iter(fresh_results)
+    batch_results = []
+    image_paths = []
+    for img_path, key, cached in plan:
+        if cached is None:
+            cached = next(fresh, None)
+            if cached is None:
+                break
+            _store_tags(key, cached)
+        batch_results.append(dict(cached, image_index=len(batch_results)))
+        image_paths.append(img_path)
+    return {
+        "batch_results": batch_results,
+        "batch_results_soa": _to_columns(batch_results),
+        "image_paths": image_paths,
+    }
+
+
+def _to_columns(batch_results: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose per-image results into one list per field.
+
+    Column lists let callers work on a single field across the batch, e.g.
+    ``Counter(chain.from_iterable(columns["tags"]))``, without visiting
+    every result dict.
+
+    Args:
+        batch_results: Per-image results in batch order
+
+    Returns:
+        Dict mapping each result field to its values, aligned with the batch
+    """
+    return {
+        field: [result.get(field) for result in batch_results]
+        for field in RESULT_FIELDS
+    }
+
+
+def _configured_client() -> genai.Client:
+    """Return the shared client for the configured API key.
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY environment variable is not set
+    """
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "API key must be provided or set as GOOGLE_API_KEY environment variable"
+        )
+    return _client(api_key)
+
+
+def _generation_config() -> types.GenerateContentConfig:
+    """Config with specific settings for more deterministic output."""
+    return types.GenerateContentConfig(
+        temperature=0.1,  # Low temperature for more deterministic output
+        max_output_tokens=4096,
+    )
+
+
+def _build_parts(
+    pending: List[Tuple[str, Optional[types.Part], bytes]], max_tags: int
+) -> List[types.Part]:
+    """Assemble the prompt and the image parts for one Gemini request.
+
+    Args:
+        pending: Loaded images to send, in order
+        max_tags: Maximum number of tags to extract per image
+
+    Returns:
+        List of content parts, starting with the text prompt
+    """
+    text_prompt = _PROMPT_TEMPLATE.format(n=len(pending), max_tags=max_tags)
+    return [types.Part.from_text(text=text_prompt)] + [part for _, part, _ in pending]
+
+
+def _parse_response(
+    response: types.GenerateContentResponse, valid_images: List[str]
+) -> Dict[str, Any]:
+    """Extract the JSON batch results from a Gemini response.
+
+    Args:
+        response: Response returned by ``generate_content``
+        valid_images: Paths of the images that were sent, in order
+
+    Returns:
+        Dict with ``batch_results`` and ``image_paths``, or an ``error`` key
+    """
+    try:
+        raw_text = response_text(response)
+        if not raw_text:
+            return {"error": "Empty response from API"}
+        # Remove any markdown code block indicators if present
+        batch_results = orjson.loads(
+            raw_text.replace("```json", "").replace("```", "").strip()
+        )
+
+        # Map results to original filenames
+        return {"batch_results": batch_results, "image_paths": valid_images}
+
+    except orjson.JSONDecodeError as e:
+        return {
+            "error": f"Failed to parse JSON response: {str(e)}",
+            "raw_response": raw_text,
+        }
 
 
 def get_image_tags_batch_as_parts(
@@ -46,6 +308,7 @@ def get_image_tags_batch_as_parts(
     Returns:
         Dict containing:
         - batch_results: List of analysis results for each image
+        - batch_results_soa: The same results as one list per field
         - image_paths: List of successfully processed image paths
         - error: Error message if processing failed
 
@@ -60,108 +323,80 @@ def get_image_tags_batch_as_parts(
         ...         print(f"Tags: {analysis['tags']}")
         ...         print(f"Description: {analysis['description']}")
     """
-    load_dotenv()
-    # Configure the Gemini API
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "API key must be provided or set as GOOGLE_API_KEY environment variable"
-        )
-    # cspell:disable-next-line
-    client = genai.Client(api_key=api_key)
+    client = _configured_client()
+    config = _generation_config()
 
-    # Initialize the config with specific settings for more deterministic output
-    config = types.GenerateContentConfig(
-        temperature=0.1,  # Low temperature for more deterministic output
-        max_output_tokens=4096,
-    )
+    # Read the stored payloads in parallel; file reads and base64 decoding of
+    # legacy payloads release the GIL. map() keeps the original image order.
+    with ThreadPoolExecutor(max_workers=min(32, max(1, len(image_paths)))) as executor:
+        loaded = list(executor.map(_load_part, image_paths))
 
-    # Prepare the images and parts
-    parts = []
-    valid_images = []
-
-    # Create the text prompt that specifies the exact JSON structure we want
-    text_prompt = f"""
-    Analyze these {len(image_paths)} images and provide detailed information about each one.
-    
-    Return ONLY a valid JSON array with one object per image, where each object has this exact structure:
-    
-    {{
-      "image_index": <index of image starting from 0>,
-      "tags": [<up to {max_tags} descriptive tags as strings>],
-      "objects": [
-        {{
-          "name": "<object name>",
-          "location": "<location in image>"
-        }}
-      ],
-      "scene_type": "<type of scene: indoor, outdoor, urban, nature, etc.>",
-      "colors": [<dominant colors as strings>],
-      "description": "<brief description of image content>"
-    }}
-    
-    Only respond with the raw JSON array, with no markdown formatting, no code blocks, no explanations.
-    The response must start with '[' and end with ']' and be valid JSON that can be parsed directly.
-    """
-    parts.append(types.Part.from_text(text=text_prompt))
+    plan, pending = _plan_batch(loaded)
+    if not plan:
+        return {"error": "No valid images provided"}
 
-    # Add each image as a part by reading base64 files
-    for _, img_path in enumerate(image_paths):
+    fresh_results = []
+    if pending:
         try:
-            # Construct full path to the base64 file in images directory
-            full_path = os.path.join("images", img_path)
-
-            # Read the base64 content from the file
-            with open(full_path, "r") as f:
-                base64_content = f.read().strip()
-
-            # Handle data URL format (data:image/jpeg;base64,<data>)
-            if base64_content.startswith("data:"):
-                # Extract mime type and base64 data
-                header, base64_data = base64_content.split(",", 1)
-                mime_type = header.split(":", 1)[1].split(";", 1)[0]
-            else:
-                # Assume it's raw base64 data and default mime type
-                base64_data = base64_content
-                mime_type = "image/jpeg"
-
-            # Decode base64 to bytes
-            image_bytes = base64.b64decode(base64_data)
-
-            parts.append(types.Part.from_bytes(data=image_bytes, mime_type=mime_type))
-            valid_images.append(img_path)
+            # Process with Gemini
+            response = client.models.generate_content(
+                model=TAGGING_MODEL,
+                contents=_build_parts(pending, max_tags),
+                config=config,
+            )
+            parsed = _parse_response(response, [path for path, _, _ in pending])
         except Exception as e:
-            print(f"Error loading image {img_path}: {e}")
+            return {"error": str(e)}
+        if "error" in parsed:
+            return parsed
+        fresh_results = parsed["batch_results"]
 
-    if len(parts) <= 1:  # Only the text prompt, no valid images
-        return {"error": "No valid images provided"}
+    return _merge_results(plan, fresh_results)
 
-    try:
-        # Process with Gemini
-        response = client.models.generate_content(
-            model="gemini-1.5-flash", contents=parts, config=config
-        )
 
-        # Extract JSON from the response text
-        try:
-            response_text = response.text
-            if not response_text:
-                return {"error": "Empty response from API"}
-            # Remove any markdown code block indicators if present
-            response_text = (
-                response_text.replace("```json", "").replace("```", "").strip()
-            )
-            batch_results = json.loads(response_text)
+async def get_image_tags_batch_as_parts_async(
+    image_paths: List[str], max_tags: int = 20
+) -> Dict[str, Any]:
+    """Async variant of ``get_image_tags_batch_as_parts``.
 
-            # Map results to original filenames
-            results = {"batch_results": batch_results, "image_paths": valid_images}
-            return results
+    Payloads are loaded in worker threads and the Gemini request goes through
+    the client's async API, so several batches can be in flight at once
+    without tying up a thread each while waiting on the network.
+
+    Args:
+        image_paths: List of image store references to analyze
+        max_tags: Maximum number of tags to extract per image
 
-        except json.JSONDecodeError as e:
-            return {
-                "error": f"Failed to parse JSON response: {str(e)}",
-                "raw_response": response.text,
-            }
+    Returns:
+        Dict with the same keys as ``get_image_tags_batch_as_parts``
 
-    except Exception as e:
-        return {"error": str(e)}
+    Raises:
+        ValueError: If GOOGLE_API_KEY environment variable is not set
+    """
+    client = _configured_client()
+    config = _generation_config()
+
+    loaded = await asyncio.gather(
+        *(asyncio.to_thread(_load_part, path) for path in image_paths)
+    )
+
+    plan, pending = _plan_batch(loaded)
+    if not plan:
+        return {"error": "No valid images provided"}
+
+    fresh_results = []
+    if pending:
+        try:
+            response = await client.aio.models.generate_content(
+                model=TAGGING_MODEL,
+                contents=_build_parts(pending, max_tags),
+                config=config,
+            )
+            parsed = _parse_response(response, [path for path, _, _ in pending])
+        except Exception as e:
+            return {"error": str(e)}
+        if "error" in parsed:
+            return parsed
+        fresh_results = parsed["batch_results"]
+
+    return _merge_results(plan, fresh_results)
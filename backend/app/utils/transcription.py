@@ -1,12 +1,23 @@
+import asyncio
+import atexit
+import functools
+import hashlib
+import inspect
+import io
+import logging
 import os
-import wave
+import struct
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import dotenv
-import numpy as np
 import sounddevice as sd
-from google import genai
+from google.genai import errors, types
+
+from .gemini import create_client, response_text
+
+logger = logging.getLogger(__name__)
 
 """
 USE transcribe() FUNCTION< AND PASS IN THE PATH TO THE AUDIO FILE
@@ -19,16 +30,250 @@ def configure_gemini():
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
-    return genai.Client(api_key=api_key)
+    return create_client(api_key)
 
 
+# Created once at import; every transcription reuses its connection pool
 client = configure_gemini()
 
+TRANSCRIPTION_MODEL = "gemini-1.5-flash"
+
+TRANSCRIPTION_PROMPT = """
+        Please transcribe this audio file to text. 
+        Provide only the transcribed text without any additional commentary or formatting.
+        If the audio is unclear or inaudible, indicate that in the transcription.
+        """
+
+# Audio below this size is sent inline with the transcription request, saving
+# the separate upload and delete round trips (Gemini caps requests at 20 MB)
+INLINE_AUDIO_LIMIT = 19_000_000
+
+# Mime types Gemini accepts for inline audio, by file extension
+_INLINE_AUDIO_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mp3",
+    ".aiff": "audio/aiff",
+    ".aac": "audio/aac",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+# Default cap on uploads in flight in transcribe_many, to stay clear of
+# Gemini rate limits
+TRANSCRIBE_CONCURRENCY = 8
+
+# Transcriptions are stored here by a hash of the audio bytes, so the same
+# audio is never uploaded and billed twice
+_CACHE_DIR = Path("database/transcribe_cache")
+
+# Async transcriptions in flight by audio hash, so concurrent requests for the
+# same audio share one Gemini call
+_inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+# Retries for rate limited (429) and server error (5xx) responses, waiting
+# RETRY_BASE_DELAY seconds and doubling the wait after each attempt
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 1.0
+
+
+def _audio_key(audio_file_path: str) -> str:
+    """Hash the audio file contents, reading it in chunks."""
+    with open(audio_file_path, "rb") as f:
+        return hashlib.file_digest(
+            f, lambda: hashlib.blake2b(digest_size=16)
+        ).hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_cached_transcription(key: str) -> str:
+    try:
+        return (_CACHE_DIR / f"{key}.txt").read_text()
+    except FileNotFoundError:
+        # lru_cache does not store exceptions, so misses are checked again
+        raise KeyError(key)
+
+
+def _cached_transcription(key: str) -> Optional[str]:
+    """Return a stored transcription for an audio hash, if there is one."""
+    try:
+        return _read_cached_transcription(key)
+    except KeyError:
+        return None
+
+
+def _store_transcription(key: str, text: str) -> None:
+    """Store a transcription for an audio hash, replacing the file atomically."""
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = _CACHE_DIR / f"{key}.txt.{os.getpid()}.tmp"
+        tmp_path.write_text(text)
+        os.replace(tmp_path, _CACHE_DIR / f"{key}.txt")
+    except OSError as e:
+        logger.warning("Error caching transcription: %s", e)
+
+
+def _is_retryable(error: Exception) -> bool:
+    return isinstance(error, errors.APIError) and (
+        error.code == 429 or error.code >= 500
+    )
+
+
+def with_retry(func):
+    """Retry a Gemini call with exponential backoff on 429 and 5xx errors.
+
+    Works for both regular and async functions.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            for attempt in range(RETRY_ATTEMPTS):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                        raise
+                    await asyncio.sleep(RETRY_BASE_DELAY * 2**attempt)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                time.sleep(RETRY_BASE_DELAY * 2**attempt)
+
+    return wrapper
+
+
+def _transcript_text(response) -> Optional[str]:
+    """Return the stripped transcript text of a response, or None if empty."""
+    text = response_text(response)
+    if not text:
+        return None
+    return text.strip() or None
+
+
+@with_retry
+def _generate_transcription(audio_file) -> Optional[str]:
+    response = client.models.generate_content(
+        model=TRANSCRIPTION_MODEL, contents=[TRANSCRIPTION_PROMPT, audio_file]
+    )
+    return _transcript_text(response)
+
+
+@with_retry
+async def _generate_transcription_async(audio_file) -> Optional[str]:
+    response = await client.aio.models.generate_content(
+        model=TRANSCRIPTION_MODEL, contents=[TRANSCRIPTION_PROMPT, audio_file]
+    )
+    return _transcript_text(response)
+
+
+def _inline_audio(source, mime_type: Optional[str] = None) -> Optional[types.Part]:
+    """Load small audio as an inline request part.
+
+    Args:
+        source: Path or in-memory file object holding the audio
+        mime_type: Mime type of the audio; guessed from a path's extension
+
+    Returns:
+        types.Part: Inline audio part, or None if the audio has to be uploaded
+    """
+    if isinstance(source, io.BytesIO):
+        data = source.getvalue()
+    else:
+        mime_type = mime_type or _INLINE_AUDIO_TYPES.get(Path(source).suffix.lower())
+        if not mime_type or os.path.getsize(source) >= INLINE_AUDIO_LIMIT:
+            return None
+        data = Path(source).read_bytes()
+
+    if not mime_type or len(data) >= INLINE_AUDIO_LIMIT:
+        return None
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+
+def _transcribe_upload(
+    key: str, source, mime_type: Optional[str] = None
+) -> Optional[str]:
+    """Transcribe audio with Gemini unless its hash already has a transcription.
+
+    Args:
+        key: Content hash of the audio, used as the cache key
+        source: Path or file object to upload
+        mime_type: Mime type of the upload, required for file objects
+
+    Returns:
+        Optional[str]: Transcribed text or None if Gemini returned nothing
+    """
+    # Skip Gemini entirely for audio that was transcribed before
+    cached = _cached_transcription(key)
+    if cached is not None:
+        return cached
+
+    # Small clips go inline in a single request
+    audio_part = _inline_audio(source, mime_type)
+    if audio_part is not None:
+        text = _generate_transcription(audio_part)
+        if text:
+            _store_transcription(key, text)
+        return text
+
+    # Upload the audio to Gemini
+    config = {"mime_type": mime_type} if mime_type else None
+    audio_file = client.files.upload(file=source, config=config)
+    try:
+        # Use Gemini to transcribe the audio
+        text = _generate_transcription(audio_file)
+    finally:
+        # Clean up the uploaded file, even if transcription failed
+        if audio_file.name:
+            client.files.delete(name=audio_file.name)
+
+    if text:
+        _store_transcription(key, text)
+    return text
+
+
+async def _upload_and_transcribe_async(audio_file_path: str, key: str) -> Optional[str]:
+    """Upload an audio file, transcribe it and cache the transcription.
+
+    Small clips are sent inline with the transcription request instead.
+    """
+    audio_part = await asyncio.to_thread(_inline_audio, audio_file_path)
+    if audio_part is not None:
+        text = await _generate_transcription_async(audio_part)
+    else:
+        audio_file = await client.aio.files.upload(file=audio_file_path)
+        try:
+            text = await _generate_transcription_async(audio_file)
+        finally:
+            # Clean up the uploaded file
+            if audio_file.name:
+                await client.aio.files.delete(name=audio_file.name)
+
+    if text:
+        await asyncio.to_thread(_store_transcription, key, text)
+    return text
+
+
+def _lookup_transcription(audio_file_path: str) -> Tuple[str, Optional[str]]:
+    """Hash an audio file and look up its stored transcription."""
+    key = _audio_key(audio_file_path)
+    return key, _cached_transcription(key)
+
 
 def transcribe_audio_with_gemini(audio_file_path: str) -> Optional[str]:
     """
     Transcribe an audio file to text using Google Gemini.
 
+    Results are cached on disk by a hash of the audio contents, and rate
+    limited or failed Gemini requests are retried with backoff.
+
     Args:
         audio_file_path (str): Path to the audio file to transcribe
 
@@ -41,80 +286,199 @@ def transcribe_audio_with_gemini(audio_file_path: str) -> Optional[str]:
         Exception: For other transcription errors
     """
     try:
-        # Check if file exists
-        if not Path(audio_file_path).exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+        # Hashing opens the file, which raises FileNotFoundError for a missing
+        # path without a separate exists() check
+        return _transcribe_upload(_audio_key(audio_file_path), audio_file_path)
 
-        # Upload the audio file to Gemini
-        audio_file = client.files.upload(file=audio_file_path)
+    except FileNotFoundError:
+        raise
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"Error transcribing audio: {str(e)}")
+        return None
 
-        # Use Gemini to transcribe the audio
-        prompt = """
-        Please transcribe this audio file to text. 
-        Provide only the transcribed text without any additional commentary or formatting.
-        If the audio is unclear or inaudible, indicate that in the transcription.
-        """
 
-        response = client.models.generate_content(
-            model="gemini-1.5-flash", contents=[prompt, audio_file]
-        )
+async def transcribe_audio_with_gemini_async(audio_file_path: str) -> Optional[str]:
+    """
+    Transcribe an audio file to text using Google Gemini's async API.
 
-        # Clean up the uploaded file
-        if audio_file.name:
-            client.files.delete(name=audio_file.name)
+    Same behavior as transcribe_audio_with_gemini, but the upload, the
+    transcription request and the cleanup are awaited instead of blocking,
+    so several files can be transcribed concurrently.
 
-        return response.text.strip() if response.text else None
+    Args:
+        audio_file_path (str): Path to the audio file to transcribe
+
+    Returns:
+        Optional[str]: Transcribed text or None if transcription fails
+
+    Raises:
+        FileNotFoundError: If the audio file doesn't exist
+    """
+    try:
+        # Skip Gemini entirely for audio that was transcribed before
+        key, cached = await asyncio.to_thread(_lookup_transcription, audio_file_path)
+        if cached is not None:
+            return cached
+
+        # Share the result of a call already in flight for the same audio. The
+        # shield keeps a cancelled waiter from cancelling the shared call.
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            text = await _upload_and_transcribe_async(audio_file_path, key)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other caller waits
+            future.exception()
+            raise
+        finally:
+            _inflight.pop(key, None)
+            if not future.done():
+                future.cancel()
 
     except FileNotFoundError:
         raise
-    except ValueError:
-        raise
-    except Exception as e:
-        print(f"Error transcribing audio: {str(e)}")
+    except Exception:
+        logger.exception("Error transcribing audio")
         return None
 
 
+async def transcribe_many(
+    audio_file_paths: List[str], concurrency: int = TRANSCRIBE_CONCURRENCY
+) -> List[Optional[str]]:
+    """
+    Transcribe several audio files concurrently.
+
+    Args:
+        audio_file_paths (List[str]): Paths of the audio files to transcribe
+        concurrency (int): Maximum number of files being transcribed at once
+
+    Returns:
+        List[Optional[str]]: Transcriptions in the order of the input paths,
+        None for files that could not be transcribed
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def transcribe_one(path: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await transcribe_audio_with_gemini_async(path)
+            except FileNotFoundError as e:
+                logger.error("Error transcribing audio: %s", e)
+                return None
+
+    async with asyncio.TaskGroup() as group:
+        tasks = [group.create_task(transcribe_one(path)) for path in audio_file_paths]
+    return [task.result() for task in tasks]
+
+
+# RIFF/WAVE header for 16-bit mono PCM: chunk ids, fmt chunk and data chunk size
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+_WAV_SIZE = struct.Struct("<I")
+# Prebuilt header for the 44.1 kHz default; only the two size fields change
+_WAV_HEADER_TEMPLATE = _WAV_HEADER.pack(
+    b"RIFF", 0, b"WAVE", b"fmt ", 16, 1, 1, 44100, 44100 * 2, 2, 16, b"data", 0
+)
+
+
+def _wav_header(data_size: int, sample_rate: int) -> bytes:
+    """Build the 44-byte WAV header for ``data_size`` bytes of 16-bit mono PCM."""
+    if sample_rate != 44100:
+        return _WAV_HEADER.pack(
+            b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, 1,
+            sample_rate, sample_rate * 2, 2, 16, b"data", data_size,
+        )
+    return b"".join(
+        (
+            _WAV_HEADER_TEMPLATE[:4],
+            _WAV_SIZE.pack(36 + data_size),
+            _WAV_HEADER_TEMPLATE[8:40],
+            _WAV_SIZE.pack(data_size),
+        )
+    )
+
+
+def _write_wav(target, audio_bytes, sample_rate: int) -> None:
+    """Write 16-bit mono PCM samples as a WAV file to a path or file object."""
+    # The bytes are already 16-bit PCM samples, so write them as-is after the
+    # header instead of going through the wave module; a trailing half sample
+    # is dropped
+    samples = memoryview(audio_bytes).cast("B")
+    samples = samples[: len(samples) - len(samples) % 2]
+    chunks = (_wav_header(len(samples), sample_rate), samples)
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "wb") as f:
+            f.writelines(chunks)
+    else:
+        target.writelines(chunks)
+
+
 def save_audio_from_bytes(
     audio_bytes: bytes, sample_rate: int = 44100, filename: str = "audio.wav"
 ):
-    audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(audio_np.tobytes())
+    _write_wav(filename, audio_bytes, sample_rate)
 
 
 def transcribe_audio_from_bytes(
-    audio_bytes: bytes, filename: str = "audio.wav"
+    audio_bytes: bytes, sample_rate: int = 44100
 ) -> Optional[str]:
     """
     Transcribe audio from bytes using Google Gemini.
 
+    The WAV file is built in memory and sent from there, so nothing is
+    written to disk and concurrent calls cannot overwrite each other's audio.
+
     Args:
-        audio_bytes (bytes): Audio data as bytes
-        filename (str): Filename for the temporary file (with extension)
+        audio_bytes (bytes): 16-bit mono PCM audio data
+        sample_rate (int): Sample rate of the audio
 
     Returns:
         Optional[str]: Transcribed text or None if transcription fails
     """
     try:
-        # Create a temporary file
-        save_audio_from_bytes(audio_bytes, filename=filename)
+        buffer = io.BytesIO()
+        _write_wav(buffer, audio_bytes, sample_rate)
 
-        try:
-            # Transcribe the temporary file
-            result = transcribe_audio_with_gemini(filename)
-            return result
-        finally:
-            # Clean up the temporary file
-            Path(filename).unlink(missing_ok=True)
+        # Same key as hashing the WAV file on disk, so both paths share the cache
+        key = hashlib.blake2b(buffer.getbuffer(), digest_size=16).hexdigest()
+        buffer.seek(0)
+        return _transcribe_upload(key, buffer, mime_type="audio/wav")
 
     except Exception as e:
         print(f"Error transcribing audio from bytes: {str(e)}")
         return None
 
 
+# Microphone capture format used by record_wav
+RECORD_SAMPLE_RATE = 44100
+RECORD_CHANNELS = 1
+
+
+@functools.lru_cache(maxsize=1)
+def _input_stream() -> sd.InputStream:
+    """Open the default input device once and keep it open between recordings.
+
+    The stream is only started while recording, so no audio is buffered in
+    between, but PortAudio and the device are not reinitialized per clip.
+    """
+    stream = sd.InputStream(
+        samplerate=RECORD_SAMPLE_RATE,
+        channels=RECORD_CHANNELS,
+        dtype="int16",
+        blocksize=4096,
+    )
+    atexit.register(stream.close)
+    return stream
+
+
 def record_wav(filename: str = "audio.wav"):
     """
     Record 3 second audio from the microphone and save it to a file.
@@ -126,30 +490,23 @@ def record_wav(filename: str = "audio.wav"):
         str: Path to the recorded audio file, or None if recording failed
     """
     try:
-        import wave
-
-        # Record audio parameters
         duration = 3  # seconds
-        samplerate = 44100
-        channels = 1
 
         print(f"Recording {duration} seconds of audio...")
 
-        # Record the audio
-        frames = int(duration * samplerate)
-        audio = sd.rec(
-            frames=frames, samplerate=samplerate, channels=channels, dtype="int16"
-        )
-        sd.wait()  # Wait for recording to complete
+        # Read from the already open input stream
+        stream = _input_stream()
+        stream.start()
+        try:
+            audio, _ = stream.read(int(duration * RECORD_SAMPLE_RATE))
+        finally:
+            stream.stop()
 
         print("Recording complete. Saving to file...")
 
-        # Save as WAV file
-        with wave.open(filename, "wb") as wf:
-            wf.setnchannels(channels)
-            wf.setsampwidth(2)  # 2 bytes for int16
-            wf.setframerate(samplerate)
-            wf.writeframes(audio.tobytes())
+        # Save as WAV file; the header is prebuilt and the array's buffer is
+        # written directly, without a tobytes() copy
+        _write_wav(filename, audio, RECORD_SAMPLE_RATE)
 
         print(f"Audio saved to {filename}")
         return filename
@@ -0,0 +1,140 @@
+"""In-memory index of audio transcription embeddings.
+
+Similarity searches used to select and decode every embedding blob from
+SQLite on each query. The index keeps the vectors of all audio records in
+one contiguous float32 matrix for the life of the process, so a search is a
+single matrix-vector product over memory that is already decoded. The audio
+repository loads it on first use and keeps it in step as embeddings are
+stored, cleared or deleted.
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding import cosine_similarity_matrix, cosine_topk
+
+# Rows allocated when the first vector is added; capacity doubles from there
+INITIAL_CAPACITY = 256
+
+
+class EmbeddingIndex:
+    """Exact cosine-similarity index over L2-normalized embeddings.
+
+    Rows are kept dense: removing a vector moves the last row into its slot,
+    so searches always run over ``matrix[:len(index)]`` without gaps.
+
+    Attributes:
+        loaded: Whether the index has been filled from the database
+        lock: Held while loading and while applying committed changes, so an
+            update that lands during the initial load is not overwritten
+    """
+
+    def __init__(self):
+        """Initialize an empty, not yet loaded index."""
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        """Replace the contents of the index and mark it as loaded.
+
+        Args:
+            items: ``(id, embedding)`` pairs
+        """
+        self._ids = []
+        self._rows = {}
+        self._matrix = None
+        for item_id, embedding in items:
+            self.add(item_id, embedding)
+        self.loaded = True
+
+    def add(self, item_id: str, embedding: Sequence[float]) -> bool:
+        """Insert or replace the embedding stored for an ID.
+
+        Args:
+            item_id: ID of the embedded record
+            embedding: L2-normalized embedding vector
+
+        Returns:
+            bool: False if the vector's length does not match the index
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self._matrix is None:
+            self._matrix = np.empty((INITIAL_CAPACITY, len(vector)), dtype=np.float32)
+        elif len(vector) != self._matrix.shape[1]:
+            return False
+
+        row = self._rows.get(item_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._matrix):
+                grown = np.empty((2 * row, self._matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self._ids.append(item_id)
+            self._rows[item_id] = row
+        self._matrix[row] = vector
+        return True
+
+    def remove(self, item_id: str) -> None:
+        """Drop the embedding stored for an ID, if any.
+
+        Args:
+            item_id: ID of the record whose embedding is removed
+        """
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            # Move the last row into the gap to keep the matrix dense
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+
+    def row(self, item_id: str) -> int:
+        """Return the row of an ID in ``scores`` results, or -1 if absent."""
+        return self._rows.get(item_id, -1)
+
+    def scores(self, query_embedding: Sequence[float]) -> np.ndarray:
+        """Score every indexed embedding against a query.
+
+        Args:
+            query_embedding: L2-normalized query vector
+
+        Returns:
+            np.ndarray: One score per row, empty if the query length differs
+        """
+        if not self._ids or len(query_embedding) != self._matrix.shape[1]:
+            return np.empty(0, dtype=np.float32)
+        return cosine_similarity_matrix([query_embedding], self._matrix[: len(self)])[0]
+
+    def search(
+        self, query_embedding: Sequence[float], k: int
+    ) -> List[Tuple[str, float]]:
+        """Find the k indexed embeddings most similar to a query.
+
+        Args:
+            query_embedding: L2-normalized query vector
+            k: Maximum number of matches to return
+
+        Returns:
+            List[Tuple[str, float]]: ``(id, score)`` pairs, highest score first
+        """
+        if not self._ids or len(query_embedding) != self._matrix.shape[1]:
+            return []
+        top, scores = cosine_topk(query_embedding, self._matrix[: len(self)], k)
+        return [(self._ids[i], float(score)) for i, score in zip(top, scores)]
+
+
+# Shared by every request and background worker in this process
+audio_embeddings = EmbeddingIndex()
@@ -10,19 +10,59 @@ This module provides:
 import os
 from typing import AsyncGenerator
 
+import orjson
+from sqlalchemy import JSON, bindparam, event, func, inspect, select, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 # Database URL - SQLite with async support
 DATABASE_URL = "sqlite+aiosqlite:///./database/media.db"
 
+
+def _json_dumps(value) -> str:
+    """Serialize a JSON column value with orjson, accepting numpy arrays."""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production
+    # Statement logging formats every parameter, including large JSON payloads
+    echo=False,
     future=True,
+    # Room for concurrent requests and background workers before requests
+    # start queueing for a connection
+    pool_size=20,
+    max_overflow=10,
+    # sqlite3 keeps prepared statements per connection keyed by SQL text;
+    # ID lists are bound as one JSON array (in_json_array) so their SQL text
+    # does not vary with the list length
+    connect_args={"cached_statements": 1024, "timeout": 30},
+    # Compiled SQL cache; room for every statement shape the app builds
+    query_cache_size=1200,
+    # JSON columns (tags, frame manifests) are encoded and decoded by orjson
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent, throughput-bound use.
+
+    WAL lets readers run while a write is in progress, NORMAL sync is safe
+    with WAL, and the larger page cache, in-memory temp storage and mmap
+    cut down on reads through the file API.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
+
+
 # Create async session maker
 async_session_maker = async_sessionmaker(
     engine,
@@ -31,6 +71,27 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def in_json_array(column, values):
+    """Build ``column IN (...)`` with every value bound as one JSON array.
+
+    A plain ``in_`` renders one placeholder per value, so each list length is
+    a different statement for SQLite to prepare and cache. Reading the values
+    back with ``json_each`` keeps the SQL text the same for any number of
+    values, and the membership test still probes the column's index.
+
+    Args:
+        column: Column to test
+        values: Values to match
+
+    Returns:
+        Boolean SQL expression, negatable with ``~`` for NOT IN
+    """
+    array = func.json_each(bindparam(None, list(values), type_=JSON)).table_valued(
+        "value"
+    )
+    return column.in_(select(array.c.value))
+
+
 class Base(DeclarativeBase):
     """Base class for all database models.
 
@@ -66,10 +127,53 @@ async def create_tables():
     that inherit from the Base class.
     """
     # Import models to ensure they're registered with Base.metadata
-    from database.models import ImageModel, VideoModel, AudioModel
+    from database.models import ImageModel, ImageTag, VideoModel, VideoTag, AudioModel
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_video_frame_count)
+        await conn.run_sync(_create_missing_indexes)
+
+
+def _add_video_frame_count(sync_conn) -> None:
+    """Add and backfill ``videos.frame_count`` on databases created before it.
+
+    The frame count and any missing duration are computed once from the
+    stored frame list, so later reads never need to load the frames.
+    """
+    columns = {column["name"] for column in inspect(sync_conn).get_columns("videos")}
+    if "frame_count" in columns:
+        return
+
+    sync_conn.execute(
+        text("ALTER TABLE videos ADD COLUMN frame_count INTEGER NOT NULL DEFAULT 0")
+    )
+    sync_conn.execute(
+        text(
+            "UPDATE videos SET frame_count = json_array_length(frames), "
+            "duration = COALESCE(duration, CASE WHEN fps > 0 "
+            "THEN json_array_length(frames) / fps END) "
+            "WHERE frames IS NOT NULL"
+        )
+    )
+
+
+# Indexes that models no longer declare, dropped from existing databases
+_OBSOLETE_INDEXES = ("ix_images_tagged_timestamp", "ix_videos_tagged_timestamp")
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    """Create indexes added to models after their tables were created.
+
+    ``create_all`` only creates the indexes of tables it creates, so indexes
+    declared later are added here to existing databases, and replaced ones
+    are dropped.
+    """
+    for name in _OBSOLETE_INDEXES:
+        sync_conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 
 async def init_db():
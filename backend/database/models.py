@@ -4,14 +4,93 @@ This module defines the SQLAlchemy models used to store image metadata,
 including paths, descriptions, tags, embeddings, and location data.
 """
 
+import json
 import uuid
-from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Float, String, Text
-
+import numpy as np
+from sqlalchemy import (
+    DDL,
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    TypeDecorator,
+    event,
+    text,
+)
+from sqlalchemy.orm import deferred, relationship
+
+from app.utils.blob_store import is_segment_reference, read_blob
+from app.utils.image_utils import payload_to_base64
 from database.database import Base
 
+# Current UTC time with millisecond precision, evaluated by SQLite
+_UTC_NOW = text("(strftime('%Y-%m-%d %H:%M:%f', 'now'))")
+
+
+class Float16Vector(TypeDecorator):
+    """Embedding vector stored as a packed float16 blob.
+
+    A 3072-dimension embedding takes 6 KB instead of roughly 60 KB of JSON
+    text, and reading it back is a zero-copy ``np.frombuffer`` instead of a
+    JSON parse. Rows written before this type was introduced still hold JSON
+    text and are decoded from that.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.asarray(value, dtype=np.float16).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return np.asarray(json.loads(value), dtype=np.float16)
+        return np.frombuffer(value, dtype=np.float16)
+
+
+class FrameManifest(TypeDecorator):
+    """List of video frames stored as references into the image segment store.
+
+    The column only holds short ``<segment>:<offset>:<length>`` references;
+    the frames themselves are written once to the segment store as decoded
+    image bytes. Loading the column returns the references without touching
+    the store. ``load_frames`` reads them back as base64 strings and does
+    blocking file I/O, so async callers run it in a worker thread. Rows
+    written before this type was introduced hold the base64 frames inline
+    and are returned unchanged.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    @staticmethod
+    def load_frame(frame):
+        """Resolve one stored manifest entry to its base64 frame."""
+        if isinstance(frame, str) and is_segment_reference(frame):
+            payload = read_blob(frame)
+            return payload_to_base64(payload) if payload is not None else ""
+        return frame
+
+    @classmethod
+    def load_frames(cls, frames):
+        """Resolve a whole manifest to its base64 frames."""
+        if frames is None:
+            return None
+        return [cls.load_frame(frame) for frame in frames]
+
 
 class ImageModel(Base):
     """SQLAlchemy model for storing image metadata.
@@ -37,6 +116,18 @@ class ImageModel(Base):
     """
 
     __tablename__ = "images"
+    __table_args__ = (
+        # Newest-first untagged rows for the tagging worker. Partial, so it
+        # only holds the backlog and shrinks as images get tagged; the
+        # predicate matches what ``tagged.is_(False)`` renders.
+        Index(
+            "ix_images_untagged_timestamp",
+            "timestamp",
+            sqlite_where=text("tagged IS 0"),
+        ),
+        # Covers the location listing without touching the table
+        Index("ix_images_geo", "latitude", "longitude", "id"),
+    )
 
     # Primary key - UUID stored as string for compatibility
     id = Column(
@@ -47,8 +138,14 @@ class ImageModel(Base):
         nullable=False,
     )
 
-    # Metadata fields
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Metadata fields - timestamp is filled in by SQLite (UTC, millisecond
+    # precision) inside the INSERT, so tables created without a default work too
+    timestamp = Column(
+        DateTime,
+        default=_UTC_NOW,
+        nullable=False,
+        index=True,  # Newest-first listing
+    )
     tagged = Column(Boolean, default=False, nullable=False)  # Processing status
 
     # AI-generated content
@@ -96,11 +193,65 @@ class ImageModel(Base):
         return 0
 
 
+class ImageTag(Base):
+    """One row per (image, tag), so tag searches can use a b-tree index.
+
+    ``ImageModel.tags`` stays the source of truth and is what the API
+    returns; SQLite triggers mirror every insert, tag update and delete on
+    the images table into this table.
+
+    Attributes:
+        image_id (str): ID of the tagged image
+        tag (str): One of the image's tags
+    """
+
+    __tablename__ = "image_tags"
+    __table_args__ = (
+        # Tag lookups read only this index
+        Index("ix_image_tags_tag", "tag", "image_id"),
+    )
+
+    image_id = Column(String(36), ForeignKey("images.id"), primary_key=True)
+    tag = Column(String(64), primary_key=True)
+
+
+# Keep image_tags in step with images.tags. Each statement runs once, when
+# the image_tags table is created, which also backfills existing images.
+for _statement in (
+    """
+    CREATE TRIGGER IF NOT EXISTS images_tags_insert AFTER INSERT ON images
+    BEGIN
+        INSERT OR IGNORE INTO image_tags (image_id, tag)
+        SELECT NEW.id, value FROM json_each(NEW.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_tags_update AFTER UPDATE OF tags ON images
+    BEGIN
+        DELETE FROM image_tags WHERE image_id = OLD.id;
+        INSERT OR IGNORE INTO image_tags (image_id, tag)
+        SELECT NEW.id, value FROM json_each(NEW.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_tags_delete AFTER DELETE ON images
+    BEGIN
+        DELETE FROM image_tags WHERE image_id = OLD.id;
+    END
+    """,
+    """
+    INSERT OR IGNORE INTO image_tags (image_id, tag)
+    SELECT images.id, tags.value FROM images, json_each(images.tags) AS tags
+    """,
+):
+    event.listen(ImageTag.__table__, "after_create", DDL(_statement))
+
+
 class VideoModel(Base):
     """SQLAlchemy model for storing video metadata.
 
     This model stores comprehensive information about videos including:
-    - Video frames as base64 strings (60fps)
+    - Video frames, kept in the segment store and read back as base64 (60fps)
     - AI-generated descriptions and tags
     - GPS coordinates for location-based features
     - Processing status tracking
@@ -111,16 +262,26 @@ class VideoModel(Base):
         timestamp (datetime): When the video record was created
         tagged (bool): Whether AI processing has been completed
         description (str): AI-generated natural language description
-        frames (list): List of base64 encoded video frames at 60fps
+        frames (list): List of base64 encoded video frames at 60fps (deferred)
         tags (list): List of AI-generated descriptive tags
         audio_id (str): Reference to AudioModel ID (optional)
+        audio (AudioModel): Linked audio record, loaded explicitly with selectinload
         latitude (float): GPS latitude coordinate (optional)
         longitude (float): GPS longitude coordinate (optional)
         fps (int): Frames per second (default: 60)
+        frame_count (int): Number of frames, stored when the video is written
         duration (float): Video duration in seconds
     """
 
     __tablename__ = "videos"
+    __table_args__ = (
+        Index(
+            "ix_videos_untagged_timestamp",
+            "timestamp",
+            sqlite_where=text("tagged IS 0"),
+        ),
+        Index("ix_videos_geo", "latitude", "longitude", "id"),
+    )
 
     # Primary key - UUID stored as string for compatibility
     id = Column(
@@ -131,20 +292,32 @@ class VideoModel(Base):
         nullable=False,
     )
 
-    # Metadata fields
-    timestamp = Column(DateTime, default=datetime.now(), nullable=False)
+    # Metadata fields - stamped by SQLite inside the INSERT, like images
+    timestamp = Column(
+        DateTime, default=_UTC_NOW, nullable=False, index=True
+    )  # Newest-first listing
 
     # AI-generated content
     tags = Column(JSON, default=list, nullable=False)  # Descriptive tags array
     tagged = Column(Boolean, default=False, nullable=False)  # Processing status
 
     # Video data
-    frames = Column(JSON, nullable=False)  # List of base64 encoded frames
+    # Loading frames reads every one from the segment store, so queries must
+    # ask for them with undefer() instead of pulling them in by default
+    frames = deferred(Column(FrameManifest, nullable=False), raiseload=True)
     fps = Column(Float, default=60.0, nullable=False)  # Frames per second
+    # Stored on insert so reading it never has to load the frame list
+    frame_count = Column(Integer, default=0, server_default="0", nullable=False)
     duration = Column(Float, nullable=True)  # Duration in seconds
 
     # Audio reference
     audio_id = Column(String(36), nullable=True)  # Reference to AudioModel ID
+    audio = relationship(
+        "AudioModel",
+        primaryjoin="foreign(VideoModel.audio_id) == AudioModel.id",
+        viewonly=True,
+        lazy="raise",  # Async sessions cannot lazy load; use selectinload
+    )
 
     # Location data (optional)
     latitude = Column(Float, nullable=True)  # GPS coordinates
@@ -156,10 +329,7 @@ class VideoModel(Base):
         Returns:
             str: Human-readable representation showing key fields
         """
-        # Avoid direct truthiness or len() on Column objects during type analysis
-        frames_value: Any = self.frames
-        frame_len = len(frames_value) if isinstance(frames_value, list) else 0
-        return f"<VideoModel(id={self.id}, frames={frame_len}, tagged={self.tagged})>"
+        return f"<VideoModel(id={self.id}, frames={self.frame_count}, tagged={self.tagged})>"
 
     @property
     def has_location(self) -> bool:
@@ -182,36 +352,74 @@ class VideoModel(Base):
             return len(tags_value)
         return 0
 
-    @property
-    def frame_count(self) -> int:
-        """Get the number of frames in this video.
-
-        Returns:
-            int: Number of frames, 0 if frames is None or not a list
-        """
-        frames_value: Any = self.frames
-        if isinstance(frames_value, list):
-            return len(frames_value)
-        return 0
-
     @property
     def calculated_duration(self) -> float:
-        """Calculate video duration based on frame count and fps.
+        """Get the video duration from the stored frame count and fps.
 
         Returns:
-            float: Duration in seconds
+            float: Duration in seconds, 0.0 if fps is not positive
         """
-        frames_value: Any = self.frames
+        if self.duration is not None:
+            return self.duration
         fps_value: Any = self.fps
-        if (
-            isinstance(frames_value, list)
-            and isinstance(fps_value, (int, float))
-            and fps_value > 0
-        ):
-            return len(frames_value) / float(fps_value)
+        if isinstance(fps_value, (int, float)) and fps_value > 0:
+            return self.frame_count / float(fps_value)
         return 0.0
 
 
+class VideoTag(Base):
+    """One row per (video, tag), so tag searches can use a b-tree index.
+
+    ``VideoModel.tags`` stays the source of truth and is what the API
+    returns; SQLite triggers mirror every insert, tag update and delete on
+    the videos table into this table.
+
+    Attributes:
+        video_id (str): ID of the tagged video
+        tag (str): One of the video's tags
+    """
+
+    __tablename__ = "video_tags"
+    __table_args__ = (
+        # Tag lookups read only this index
+        Index("ix_video_tags_tag", "tag", "video_id"),
+    )
+
+    video_id = Column(String(36), ForeignKey("videos.id"), primary_key=True)
+    tag = Column(String(64), primary_key=True)
+
+
+# Keep video_tags in step with videos.tags, as done for image_tags above
+for _statement in (
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_tags_insert AFTER INSERT ON videos
+    BEGIN
+        INSERT OR IGNORE INTO video_tags (video_id, tag)
+        SELECT NEW.id, value FROM json_each(NEW.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_tags_update AFTER UPDATE OF tags ON videos
+    BEGIN
+        DELETE FROM video_tags WHERE video_id = OLD.id;
+        INSERT OR IGNORE INTO video_tags (video_id, tag)
+        SELECT NEW.id, value FROM json_each(NEW.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS videos_tags_delete AFTER DELETE ON videos
+    BEGIN
+        DELETE FROM video_tags WHERE video_id = OLD.id;
+    END
+    """,
+    """
+    INSERT OR IGNORE INTO video_tags (video_id, tag)
+    SELECT videos.id, tags.value FROM videos, json_each(videos.tags) AS tags
+    """,
+):
+    event.listen(VideoTag.__table__, "after_create", DDL(_statement))
+
+
 class AudioModel(Base):
     """SQLAlchemy model for storing audio transcription metadata.
 
@@ -233,12 +441,14 @@ class AudioModel(Base):
         nullable=False,
     )
 
-    # Metadata fields
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Metadata fields - stamped by SQLite inside the INSERT, like videos
+    timestamp = Column(DateTime, default=_UTC_NOW, nullable=False)
 
     # Transcription data
     transcription = Column(Text, nullable=True)  # Natural language transcription
-    embedding = Column(JSON, nullable=True)  # Vector embeddings for semantic search
+    # Vector embedding for semantic search. Searches read it through the
+    # in-memory index, so rows loaded for their transcript never decode it
+    embedding = deferred(Column(Float16Vector, nullable=True), raiseload=True)
 
     def __repr__(self):
         """String representation of the AudioModel instance.
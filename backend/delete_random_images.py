@@ -6,16 +6,15 @@ Uses direct SQLAlchemy operations to avoid import dependencies.
 
 import asyncio
 import sys
-import random
 from pathlib import Path
 
 # Add the backend directory to the Python path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from database.database import get_db_session
+from database.database import async_session_maker, engine
 from database.models import ImageModel
-from sqlalchemy import delete
+from sqlalchemy import delete, func
 from sqlalchemy.future import select
 
 
@@ -27,14 +26,11 @@ async def delete_random_images():
     print(f"Starting to delete {DELETION_PERCENTAGE * 100}% of images randomly...")
     
     # Get database session
-    async for session in get_db_session():
+    async with async_session_maker() as session:
         try:
-            # Get all image IDs
-            print("Fetching all image IDs...")
-            result = await session.execute(select(ImageModel.id))
-            all_image_ids = [row[0] for row in result.all()]
-            
-            total_images = len(all_image_ids)
+            # Count the images in the database; no IDs are loaded into Python
+            print("Counting images...")
+            total_images = await session.scalar(select(func.count()).select_from(ImageModel))
             print(f"Found {total_images} total images in database")
             
             if total_images == 0:
@@ -49,30 +45,31 @@ async def delete_random_images():
                 print("Calculated 0 images to delete. Database has too few images.")
                 return
             
-            # Randomly select images to delete
-            images_to_delete = random.sample(all_image_ids, images_to_delete_count)
-            print(f"Randomly selected {len(images_to_delete)} images for deletion")
-            
-            # Confirm deletion
-            print(f"\n⚠️  WARNING: This will permanently delete {len(images_to_delete)} images!")
-            print("Image IDs to be deleted:", images_to_delete[:10], "..." if len(images_to_delete) > 10 else "")
+            print(f"\n⚠️  WARNING: This will permanently delete {images_to_delete_count} images!")
             
-            # Delete the selected images
+            # Pick and delete the random sample in one statement inside SQLite
             print("Proceeding with deletion...")
+            random_ids = (
+                select(ImageModel.id)
+                .order_by(func.random())
+                .limit(images_to_delete_count)
+            )
             result = await session.execute(
                 delete(ImageModel)
-                .where(ImageModel.id.in_(images_to_delete))
+                .where(ImageModel.id.in_(random_ids))
+                .returning(ImageModel.id)
             )
+            deleted_ids = result.scalars().all()
+            print("Image IDs deleted:", deleted_ids[:10], "..." if len(deleted_ids) > 10 else "")
             
-            deleted_count = result.rowcount
+            deleted_count = len(deleted_ids)
             print(f"Successfully deleted {deleted_count} images")
             
             # Commit the changes
             await session.commit()
             
             # Get final count for summary
-            final_result = await session.execute(select(ImageModel.id))
-            remaining_images = len(list(final_result.scalars().all()))
+            remaining_images = await session.scalar(select(func.count()).select_from(ImageModel))
             
             print(f"\nSummary:")
             print(f"- Images before deletion: {total_images}")
@@ -85,10 +82,15 @@ async def delete_random_images():
             print(f"Error occurred: {str(e)}")
             await session.rollback()
             raise
-        finally:
-            # Session will be automatically closed by the context manager
-            break
+
+
+async def main():
+    try:
+        await delete_random_images()
+    finally:
+        # Close pooled connections so their threads do not keep the process alive
+        await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(delete_random_images())
+    asyncio.run(main())
@@ -9,19 +9,41 @@ This module sets up the FastAPI application with:
 """
 
 import asyncio
+import logging
+import logging.handlers
 import os
+import queue
 from contextlib import asynccontextmanager
 from typing import List
 
 from app.routers.image import router as image_router
 from app.routers.video import router as video_router
 from app.routers.find import router as find_router
-from app.utils.background_worker import fire_image_tagging_worker
-from database.database import init_db
+from app.utils.background_worker import (
+    fire_audio_embedding_worker,
+    fire_image_tagging_worker,
+)
+from database.database import engine, init_db
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
+logger = logging.getLogger(__name__)
+
+# Application logs go through a queue to a background thread, so logging from
+# a request or worker only enqueues and never blocks on writing to stdout
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+
+for _logger in (logging.getLogger("app"), logger):
+    _logger.setLevel(logging.INFO)
+    _logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,9 +60,11 @@ async def lifespan(app: FastAPI):
         Yields:
             None: Control to FastAPI during application runtime
     """
+    log_listener.start()
+
     # Initialize database
     await init_db()
-    print("Database initialized")
+    logger.info("Database initialized")
 
     # Background tasks storage
     background_tasks: List[asyncio.Task] = []
@@ -48,14 +72,24 @@ async def lifespan(app: FastAPI):
     # Create and start the worker task
     task = asyncio.create_task(fire_image_tagging_worker())
     background_tasks.append(task)
-    print("Background worker started")
+    background_tasks.append(asyncio.create_task(fire_audio_embedding_worker()))
+    logger.info("Background worker started")
 
     yield  # FastAPI operates while the context is active
 
-    # Cleanup when the app shuts down
+    # Cleanup when the app shuts down: wait for the workers to unwind so their
+    # sessions are closed and their connections returned to the pool
     for task in background_tasks:
         task.cancel()
-    print("Background worker stopped")
+    results = await asyncio.gather(*background_tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("Background worker failed", exc_info=result)
+    logger.info("Background worker stopped")
+
+    # Close the pooled connections, each of which holds an aiosqlite thread
+    await engine.dispose()
+    log_listener.stop()
 
 
 # Create FastAPI application instance with metadata
@@ -64,7 +98,8 @@ app = FastAPI(
     description="A sophisticated image management system with AI-powered tagging and search",
     version="1.0.0",
     lifespan=lifespan,
-    debug=True
+    debug=True,
+    default_response_class=ORJSONResponse,  # orjson encodes list responses much faster
 )
 
 # Add CORS middleware to allow frontend connections
@@ -12,9 +12,9 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from database.database import get_db_session
+from database.database import async_session_maker, engine
 from database.models import ImageModel, VideoModel
-from sqlalchemy import update
+from sqlalchemy import func, update
 from sqlalchemy.future import select
 
 
@@ -28,57 +28,36 @@ async def populate_fake_coordinates():
     print(f"Starting to populate fake coordinates ({FAKE_LONGITUDE}, {FAKE_LATITUDE}) for all memories...")
     
     # Get database session
-    async for session in get_db_session():
+    async with async_session_maker() as session:
         try:
-            # Update images without coordinates
-            print("Updating images without coordinates...")
+            # Update all images with new coordinates in a single statement
+            print("Updating images with coordinates...")
+            result = await session.execute(
+                update(ImageModel).values(latitude=FAKE_LATITUDE, longitude=FAKE_LONGITUDE)
+            )
+            images_updated = result.rowcount
+            print(f"Updated {images_updated} images with coordinates ({FAKE_LONGITUDE}, {FAKE_LATITUDE})")
             
-            # Get all images to update coordinates
-            result = await session.execute(select(ImageModel.id))
-            image_ids_to_update = [row[0] for row in result.all()]
-            print(f"Found {len(image_ids_to_update)} images to update")
-            
-            # Update all images with new coordinates
-            if image_ids_to_update:
-                await session.execute(
-                    update(ImageModel)
-                    .where(ImageModel.id.in_(image_ids_to_update))
-                    .values(latitude=FAKE_LATITUDE, longitude=FAKE_LONGITUDE)
-                )
-                print(f"Updated {len(image_ids_to_update)} images with coordinates ({FAKE_LONGITUDE}, {FAKE_LATITUDE})")
-            
-            # Update videos with coordinates
+            # Update all videos with new coordinates in a single statement
             print("Updating videos with coordinates...")
-            
-            # Get all videos to update coordinates
-            result = await session.execute(select(VideoModel.id))
-            video_ids_to_update = [row[0] for row in result.all()]
-            print(f"Found {len(video_ids_to_update)} videos to update")
-            
-            # Update all videos with new coordinates
-            if video_ids_to_update:
-                await session.execute(
-                    update(VideoModel)
-                    .where(VideoModel.id.in_(video_ids_to_update))
-                    .values(latitude=FAKE_LATITUDE, longitude=FAKE_LONGITUDE)
-                )
-                print(f"Updated {len(video_ids_to_update)} videos with coordinates ({FAKE_LONGITUDE}, {FAKE_LATITUDE})")
+            result = await session.execute(
+                update(VideoModel).values(latitude=FAKE_LATITUDE, longitude=FAKE_LONGITUDE)
+            )
+            videos_updated = result.rowcount
+            print(f"Updated {videos_updated} videos with coordinates ({FAKE_LONGITUDE}, {FAKE_LATITUDE})")
             
             # Commit all changes
             await session.commit()
             
             # Get total counts for summary
-            total_images_result = await session.execute(select(ImageModel.id))
-            total_images = len(list(total_images_result.scalars().all()))
-            
-            total_videos_result = await session.execute(select(VideoModel.id))
-            total_videos = len(list(total_videos_result.scalars().all()))
+            total_images = await session.scalar(select(func.count()).select_from(ImageModel))
+            total_videos = await session.scalar(select(func.count()).select_from(VideoModel))
             
             print(f"\nSummary:")
             print(f"- Total images in database: {total_images}")
-            print(f"- Images updated with coordinates: {len(image_ids_to_update)}")
+            print(f"- Images updated with coordinates: {images_updated}")
             print(f"- Total videos in database: {total_videos}")
-            print(f"- Videos updated with coordinates: {len(video_ids_to_update)}")
+            print(f"- Videos updated with coordinates: {videos_updated}")
             print(f"- Fake coordinates used: ({FAKE_LONGITUDE}, {FAKE_LATITUDE})")
             print("✅ All memories now have GPS coordinates!")
             
@@ -86,10 +65,15 @@ async def populate_fake_coordinates():
             print(f"Error occurred: {str(e)}")
             await session.rollback()
             raise
-        finally:
-            # Session will be automatically closed by the context manager
-            break
+
+
+async def main():
+    try:
+        await populate_fake_coordinates()
+    finally:
+        # Close pooled connections so their threads do not keep the process alive
+        await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(populate_fake_coordinates())
+    asyncio.run(main())
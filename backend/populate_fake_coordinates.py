@@ -12,9 +12,10 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from database.database import get_db_session
-from app.repository.image_repository import ImageRepository
-from app.repository.video_repository import VideoRepository
+from database.database import async_session_maker, engine
+from database.models import ImageModel, VideoModel
+from sqlalchemy import func, or_, update
+from sqlalchemy.future import select
 
 
 async def populate_fake_coordinates():
@@ -26,64 +27,46 @@ async def populate_fake_coordinates():
     print(f"Starting to populate fake coordinates ({FAKE_COORDINATE}, {FAKE_COORDINATE}) for all memories...")
     
     # Get database session
-    async for session in get_db_session():
+    async with async_session_maker() as session:
         try:
-            # Initialize repositories
-            image_repo = ImageRepository(session)
-            video_repo = VideoRepository(session)
+            # Fill in missing coordinates with one UPDATE per table instead
+            # of loading every row and updating them one at a time
+            updated_counts = {}
+            for name, model in (("images", ImageModel), ("videos", VideoModel)):
+                print(f"Updating {name} without coordinates...")
+                result = await session.execute(
+                    update(model)
+                    .where(or_(model.latitude.is_(None), model.longitude.is_(None)))
+                    .values(latitude=FAKE_COORDINATE, longitude=FAKE_COORDINATE)
+                )
+                updated_counts[name] = result.rowcount
+                print(f"Updated {result.rowcount} {name} with fake coordinates")
             
-            # Get all images
-            print("Fetching all images...")
-            all_images = await image_repo.get_all_images(skip=0, limit=10000)  # Large limit to get all
-            print(f"Found {len(all_images)} images")
+            await session.commit()
             
-            # Update each image with fake coordinates
-            updated_images = 0
-            for image in all_images:
-                if image.latitude is None or image.longitude is None:
-                    await image_repo.update_image(
-                        image_id=image.id,
-                        latitude=FAKE_COORDINATE,
-                        longitude=FAKE_COORDINATE
-                    )
-                    updated_images += 1
-                    print(f"Updated image {image.id} with fake coordinates")
-            
-            print(f"Updated {updated_images} images with fake coordinates")
-            
-            # Get all videos
-            print("Fetching all videos...")
-            all_videos = await video_repo.get_all_videos(skip=0, limit=10000)  # Large limit to get all
-            print(f"Found {len(all_videos)} videos")
-            
-            # Update each video with fake coordinates
-            updated_videos = 0
-            for video in all_videos:
-                if video.latitude is None or video.longitude is None:
-                    await video_repo.update_video(
-                        video_id=video.id,
-                        latitude=FAKE_COORDINATE,
-                        longitude=FAKE_COORDINATE
-                    )
-                    updated_videos += 1
-                    print(f"Updated video {video.id} with fake coordinates")
-            
-            print(f"Updated {updated_videos} videos with fake coordinates")
+            total_images = await session.scalar(select(func.count()).select_from(ImageModel))
+            total_videos = await session.scalar(select(func.count()).select_from(VideoModel))
             
             print(f"\nSummary:")
-            print(f"- Total images: {len(all_images)}")
-            print(f"- Images updated: {updated_images}")
-            print(f"- Total videos: {len(all_videos)}")
-            print(f"- Videos updated: {updated_videos}")
+            print(f"- Total images: {total_images}")
+            print(f"- Images updated: {updated_counts['images']}")
+            print(f"- Total videos: {total_videos}")
+            print(f"- Videos updated: {updated_counts['videos']}")
             print(f"- Fake coordinates used: ({FAKE_COORDINATE}, {FAKE_COORDINATE})")
             
         except Exception as e:
             print(f"Error occurred: {str(e)}")
+            await session.rollback()
             raise
-        finally:
-            # Session will be automatically closed by the context manager
-            break
+
+
+async def main():
+    try:
+        await populate_fake_coordinates()
+    finally:
+        # Close pooled connections so their threads do not keep the process alive
+        await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(populate_fake_coordinates())
+    asyncio.run(main())
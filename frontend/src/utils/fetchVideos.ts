@@ -9,7 +9,7 @@ export type VideosData = {
 // Backend API response type for videos
 interface BackendVideoResponse {
   id: string;
-  frames: string[]; // Array of base64 frame strings
+  frames?: string[]; // Not included by the list endpoint; see /video/{id}
   timestamp: string;
   description: string | null;
   tags: string[];
@@ -45,7 +45,7 @@ export const fetchVideos = async (): Promise<VideosData> => {
         id: video.id,
         date: new Date(video.timestamp).toISOString().split('T')[0],
         tags: video.tags,
-        frames: video.frames,
+        frames: video.frames ?? [],
         description: video.description || '',
         location: video.latitude && video.longitude
           ? `${video.latitude.toFixed(4)}, ${video.longitude.toFixed(4)}`